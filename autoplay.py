@@ -0,0 +1,324 @@
+# autoplay.py
+
+import argparse
+import heapq
+import itertools
+import os
+import random
+import sys
+import tempfile
+import time
+import tkinter as tk
+from collections import defaultdict
+from contextlib import ExitStack, contextmanager
+from math import asin, atan, ceil, degrees, sqrt
+from tkinter import ttk
+from unittest import mock
+
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+import visualization
+from game_engine import GameEngine
+from progress_store import ProgressStore
+from quests.simulations import GRAVITY
+from task_scheduler import TaskScheduler
+from telemetry import TelemetryLog
+
+# Controller slider values that pass Quest4 to Quest6, by quest id; the names are the quests' tk variables
+KNOWN_GOOD_SETTINGS = {
+    4: {"kp": 0.1, "ki": 0.0, "kd": 0.05},
+    5: {"mass": 1.0, "spring_const": 1.0, "damping_coeff": 2.0, "initial_displacement": 0.0},
+    6: {"kp_theta": 100.0, "ki_theta": 0.0, "kd_theta": 20.0},
+}
+MAX_ATTEMPT_MS = 120_000  # Virtual time an attempt may take, animations and the delayed end_quest included
+
+
+class HeadlessVar:
+    """
+    Stand-in for tk.DoubleVar, tk.StringVar and the other tk variables.
+    """
+    def __init__(self, master=None, value=None, name=None):
+        self.value = value
+
+    def get(self):
+        return self.value
+
+    def set(self, value):
+        self.value = value
+
+
+class HeadlessWidget:
+    """
+    Stand-in for the Tk and ttk widgets the quests create; every widget method is a no-op.
+    """
+    def __init__(self, *args, **kwargs):
+        self.options = kwargs
+
+    def __getattr__(self, name):
+        return self._ignore
+
+    def _ignore(self, *args, **kwargs):
+        return None
+
+
+class HeadlessCanvas(FigureCanvasAgg):
+    """
+    Stand-in for FigureCanvasTkAgg. The quests still update their artists, but nothing is rendered.
+    """
+    def __init__(self, figure, master=None):
+        super().__init__(figure)
+
+    def draw(self):
+        pass
+
+    def draw_idle(self, *args, **kwargs):
+        pass
+
+    def get_tk_widget(self):
+        return HeadlessWidget()
+
+
+def headless_subplots(*args, figsize=None, dpi=None, **kwargs):
+    # Like plt.subplots, but without a pyplot figure manager (which needs a Tk window) or registry entry
+    fig = Figure(figsize=figsize, dpi=dpi)
+    return fig, fig.subplots(*args, **kwargs)
+
+
+def reused_plot(create):
+    """
+    Wraps a Visualization.create_* function so the figure and artists it returns are built once and handed out
+    again whenever a quest restarts. Building the axes is most of a headless game's time, and with nothing on
+    screen only the artists' data matters, which every quest sets itself.
+    """
+    built = []
+
+    def create_once(*args, **kwargs):
+        if not built:
+            built.append(create(*args, **kwargs))
+        return built[0]
+    return staticmethod(create_once)
+
+
+@contextmanager
+def headless_tk():
+    """
+    Replaces the tk variables and widgets used by Quest1 to Quest6, the Tk figure canvas and plt.subplots
+    with window-less stand-ins, so the real quest classes run without a display. Each plot is
+    built on its first use and reused afterwards.
+    """
+    with ExitStack() as stack:
+        for name in ("DoubleVar", "StringVar", "IntVar", "BooleanVar"):
+            stack.enter_context(mock.patch.object(tk, name, HeadlessVar))
+        for module, names in ((tk, ("Frame", "Scale", "Entry", "Label", "Canvas")),
+                              (ttk, ("Frame", "Label", "Entry", "Button"))):
+            for name in names:
+                stack.enter_context(mock.patch.object(module, name, HeadlessWidget))
+        stack.enter_context(mock.patch.object(visualization, "FigureCanvasTkAgg", HeadlessCanvas))
+        stack.enter_context(mock.patch.object(visualization.plt, "subplots", headless_subplots))
+        for name in ("create_triangle_plot", "create_projectile_plot", "create_single_tank_control_plot",
+                     "create_mass_spring_damper_plots", "create_inverted_pendulum_plot"):
+            create = getattr(visualization.Visualization, name)
+            stack.enter_context(mock.patch.object(visualization.Visualization, name, reused_plot(create)))
+        yield
+
+
+class HeadlessRoot:
+    def __init__(self):
+        """
+        after/after_cancel on a virtual clock. run() executes due callbacks in time order without waiting,
+        so a quest's animation frames and its delayed end_quest take no wall-clock time.
+        """
+        self.now = 0
+        self._queue = []  # (due time, sequence, job id, callback)
+        self._live = set()
+        self._ids = itertools.count()
+
+    def after(self, delay_ms, callback):
+        sequence = next(self._ids)  # Callbacks due at the same time run in scheduling order, as in Tk
+        job_id = f"after#{sequence}"
+        heapq.heappush(self._queue, (self.now + delay_ms, sequence, job_id, callback))
+        self._live.add(job_id)
+        return job_id
+
+    def after_cancel(self, job_id):
+        self._live.discard(job_id)
+
+    def run(self, limit_ms):
+        """
+        Runs callbacks until none are pending or limit_ms of virtual time have passed.
+        """
+        deadline = self.now + limit_ms
+        while self._queue and self._queue[0][0] <= deadline:
+            due, _, job_id, callback = heapq.heappop(self._queue)
+            if job_id not in self._live:
+                continue
+            self._live.discard(job_id)
+            self.now = due
+            callback()
+
+
+class HeadlessInterface:
+    def __init__(self):
+        """
+        The parts of UserInterface the engine and quests use, without a Tk window.
+        """
+        self.root = HeadlessRoot()
+        self.player_name = HeadlessVar(value="")
+        self.player_points = HeadlessVar(value=0)
+        self.start_quest_journey_callback = None  # Will be set by GameEngine
+        self.game_engine = None  # Will be set by GameEngine
+        self.scheduler = TaskScheduler(self.root)
+        self.completed_games = 0
+
+    def show_quest_frame(self):
+        return HeadlessWidget()
+
+    def create_main_menu(self):
+        pass
+
+    def show_completion_message(self):
+        self.completed_games += 1
+
+
+def slider(rng, low, high, resolution):
+    # A random slider position, snapped to the slider's resolution
+    return round(round(rng.uniform(low, high) / resolution) * resolution, 4)
+
+
+def solve_hypotenuse(quest, rng):
+    a, b = slider(rng, 1.0, 20.0, 0.1), slider(rng, 1.0, 20.0, 0.1)
+    quest.a_value.set(a)
+    quest.b_value.set(b)
+    quest.c_value.set(f"{sqrt(a ** 2 + b ** 2):.2f}")
+    quest.check_answer()
+
+
+def solve_triangle_angles(quest, rng):
+    a, b = slider(rng, 1.0, 20.0, 0.1), slider(rng, 1.0, 20.0, 0.1)
+    quest.a_value.set(a)
+    quest.b_value.set(b)
+    quest.angle_alpha.set(f"{degrees(atan(a / b)):.1f}")
+    quest.angle_beta.set(f"{degrees(atan(b / a)):.1f}")
+    quest.check_answer()
+
+
+def solve_launch_angle(quest, rng):
+    target_distance = quest.target_distance.get()
+    # Raise the speed until the target is within range (the slider reaches 100 m/s, enough for 300 m)
+    speed = max(slider(rng, 10.0, 100.0, 1.0), float(ceil(sqrt(GRAVITY * target_distance))))
+    quest.initial_speed.set(speed)
+    quest.launch_angle.set(f"{degrees(0.5 * asin(GRAVITY * target_distance / speed ** 2)):.2f}")
+    quest.fire_projectile()
+
+
+def solve_controller(quest, rng):
+    for name, value in KNOWN_GOOD_SETTINGS[quest.quest_id].items():
+        getattr(quest, name).set(value)
+    quest.start_simulation()
+
+
+# What a player does in each quest of GameEngine's default sequence, by quest id
+SOLVERS = {1: solve_hypotenuse, 2: solve_triangle_angles, 3: solve_launch_angle,
+           4: solve_controller, 5: solve_controller, 6: solve_controller}
+
+
+def play_game(engine, name, rng, quest_seconds):
+    """
+    Plays one full game as a new player. Returns a list of problems; empty when the game went as expected.
+    Each attempt goes through the quest's own buttons' handlers; a quest that does not complete is skipped
+    so the rest of the game still runs.
+    """
+    engine.ui.player_name.set(name)
+    engine.select_player(name)
+    engine.start_quest_journey()
+
+    problems = []
+    expected_points = 0
+    while engine.current_quest_index < len(engine.quests):
+        index = engine.current_quest_index
+        quest = engine.quests[index]
+        started = time.perf_counter()
+        SOLVERS[quest.quest_id](quest, rng)
+        engine.ui.root.run(MAX_ATTEMPT_MS)  # Animation frames, then the delayed end_quest
+        quest_seconds[quest.quest_id] += time.perf_counter() - started
+        if engine.current_quest_index > index:
+            expected_points += quest.difficulty * 10
+        else:
+            problems.append(f"{name}: quest {quest.quest_id} did not accept the solver's answer")
+            engine.skip_current_quest()
+
+    if engine.player.points != expected_points:
+        problems.append(f"{name}: {engine.player.points} points, expected {expected_points}")
+    if engine.leaderboard.rank(name) is None:
+        problems.append(f"{name}: missing from the leaderboard")
+    return problems
+
+
+def run_autoplay(games, seed=0, save_dir=None, animate_replays=False):
+    """
+    Plays games full games headlessly and returns a report with throughput, per-quest timings and any problems.
+    Progress and telemetry go to save_dir, or to a temporary directory that is removed afterwards.
+    Simulation replays jump to their final frame unless animate_replays is set; the outcome is still
+    decided by each quest's own check.
+    """
+    random.seed(seed)  # Quest3 draws its target distance from the global generator
+    rng = random.Random(seed)
+    with tempfile.TemporaryDirectory() as tmp_dir, headless_tk():
+        directory = save_dir or tmp_dir
+        ui = HeadlessInterface()
+        progress_store = ProgressStore(os.path.join(directory, "progress"))
+        telemetry = TelemetryLog(os.path.join(directory, "telemetry"))
+        engine = GameEngine(ui, progress_store=progress_store, telemetry=telemetry)  # The real Quest1 to Quest6
+        for quest in engine.quests:
+            quest.animate_replays = animate_replays
+
+        quest_seconds = defaultdict(float)
+        problems = []
+        started = time.perf_counter()
+        for game in range(games):
+            problems.extend(play_game(engine, f"autoplay-{game:06d}", rng, quest_seconds))
+        elapsed = time.perf_counter() - started
+
+        engine.events.flush(5.0)
+        telemetry.flush()
+        progress_store.close()
+        if ui.completed_games != games:
+            problems.append(f"{ui.completed_games} of {games} games reached the completion screen")
+        if ui.scheduler.active_count():
+            problems.append(f"{ui.scheduler.active_count()} timers still pending after the last game")
+
+    return {
+        "games": games,
+        "seconds": elapsed,
+        "games_per_minute": games / elapsed * 60 if elapsed > 0 else float("inf"),
+        "quest_ms": {quest_id: seconds / games * 1000 for quest_id, seconds in sorted(quest_seconds.items())},
+        "events_dropped": engine.events.dropped,
+        "problems": problems,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Play full games of the real Quest1 to Quest6 without a display, "
+                                                 "through the quests' own answer checks, animations and completion, "
+                                                 "to measure throughput and catch behaviour regressions. Widgets "
+                                                 "are window-less stand-ins, plots are updated but not rendered, "
+                                                 "and simulation replays skip to their final frame.")
+    parser.add_argument("--games", type=int, default=100, help="Number of games to play")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the solvers' slider values")
+    parser.add_argument("--save-dir", default=None, help="Keep progress and telemetry here instead of a temp dir")
+    parser.add_argument("--animate-replays", action="store_true",
+                        help="Step through every frame of the simulation replays, as on screen")
+    args = parser.parse_args()
+
+    report = run_autoplay(args.games, args.seed, args.save_dir, args.animate_replays)
+    print(f"{report['games']} games in {report['seconds']:.2f} s ({report['games_per_minute']:.0f} games/min)")
+    for quest_id, ms in report["quest_ms"].items():
+        print(f"Quest {quest_id}: {ms:.3f} ms per game")
+    if report["events_dropped"]:
+        print(f"Event bus dropped {report['events_dropped']} events")
+    for problem in report["problems"][:20]:
+        print(problem)
+    if report["problems"]:
+        print(f"{len(report['problems'])} problems")
+        sys.exit(1)
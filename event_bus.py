@@ -0,0 +1,107 @@
+# event_bus.py
+
+import logging
+import queue
+import threading
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Type
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class QuestEvent:
+    quest_id: int
+    player: str
+    timestamp: float = field(default_factory=time.time, kw_only=True)
+
+
+@dataclass(frozen=True)
+class QuestStarted(QuestEvent):
+    pass
+
+
+@dataclass(frozen=True)
+class AttemptSubmitted(QuestEvent):
+    success: bool
+    parameters: Dict[str, object] = field(default_factory=dict)  # Slider values and typed answers
+
+
+@dataclass(frozen=True)
+class SimulationFinished(QuestEvent):
+    success: bool
+    parameters: Dict[str, object] = field(default_factory=dict)  # Slider values the run was started with
+    submitted_at: Optional[float] = None  # When Start/Fire was pressed; the event follows once the replay ends
+
+
+@dataclass(frozen=True)
+class QuestCompleted(QuestEvent):
+    points: int
+
+
+@dataclass(frozen=True)
+class QuestSkipped(QuestEvent):
+    pass
+
+
+class EventBus:
+    def __init__(self, maxsize: int = 1000):
+        """
+        In-process publish/subscribe for quest lifecycle events.
+        publish() only enqueues, so it never waits for subscribers; a background thread delivers the events.
+        When the queue is full, new events are dropped and counted rather than blocking the Tk thread.
+        """
+        self._queue: queue.Queue = queue.Queue(maxsize=maxsize)
+        self._subscribers: Dict[Type[QuestEvent], List[Callable]] = defaultdict(list)
+        self._lock = threading.Lock()
+        self.dropped = 0
+        self._thread = threading.Thread(target=self._dispatch, name="event-bus", daemon=True)
+        self._thread.start()
+
+    def subscribe(self, event_type: Type[QuestEvent], handler: Callable[[QuestEvent], None]) -> None:
+        """
+        Calls handler(event) for every published event of event_type or a subclass of it.
+        Handlers run on the bus thread and must not touch Tk widgets.
+        """
+        with self._lock:
+            self._subscribers[event_type].append(handler)
+
+    def unsubscribe(self, event_type: Type[QuestEvent], handler: Callable[[QuestEvent], None]) -> None:
+        with self._lock:
+            if handler in self._subscribers[event_type]:
+                self._subscribers[event_type].remove(handler)
+
+    def publish(self, event: QuestEvent) -> None:
+        try:
+            self._queue.put_nowait(event)
+        except queue.Full:
+            self.dropped += 1
+
+    def flush(self, timeout: float = None) -> bool:
+        """
+        Waits until every queued event has been delivered. Returns False if the timeout ran out first.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self._queue.unfinished_tasks:
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(0.005)
+        return True
+
+    def _dispatch(self) -> None:
+        while True:
+            event = self._queue.get()
+            try:
+                with self._lock:
+                    handlers = [handler for event_type, subscribed in self._subscribers.items()
+                                if isinstance(event, event_type) for handler in subscribed]
+                for handler in handlers:
+                    try:
+                        handler(event)
+                    except Exception:
+                        # One failing subscriber must not stop delivery to the others
+                        logger.exception("Event handler %r failed for %r", handler, event)
+            finally:
+                self._queue.task_done()
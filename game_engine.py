@@ -1,6 +1,12 @@
 # game_engine.py
 
+import logging
+
+from event_bus import EventBus, QuestCompleted, QuestSkipped, QuestStarted
+from leaderboard import Leaderboard
 from player import Player
+from progress_store import ProgressStore
+from telemetry import TelemetryLog
 from user_interface import UserInterface
 from quests.quest1 import Quest1
 from quests.quest2 import Quest2
@@ -10,35 +16,93 @@ from quests.quest5 import Quest5
 from quests.quest6 import Quest6
 from quests.quest7 import Quest7
 
+logger = logging.getLogger(__name__)
+
+
 class GameEngine:
-    def __init__(self):
-        self.ui = UserInterface()
+    def __init__(self, ui=None, quests=None, progress_store=None, telemetry=None):
+        """
+        The defaults build the Tk game. A different interface, quest list (built for that interface) and stores
+        can be passed in, e.g. by the headless autoplay runner.
+        """
+        self.ui = ui if ui is not None else UserInterface()
         self.ui.game_engine = self  # Set reference to GameEngine in UI
         self.player = None
         self.current_quest_index = 0
+        # Lifecycle events for consumers that should not run on the Tk thread (telemetry, achievements, ...)
+        self.events = EventBus()
+        # Per-attempt parameters and outcomes, written in columnar batches off the Tk thread
+        self.telemetry = telemetry if telemetry is not None else TelemetryLog()
+        self.telemetry.attach(self.events)
 
         # Initialize quests
         #self.quests = [Quest1(self.ui), Quest2(self.ui), Quest3(self.ui), Quest4(self.ui), Quest5(self.ui), Quest6(self.ui), Quest7(self.ui)]
-        self.quests = [Quest1(self.ui), Quest2(self.ui), Quest3(self.ui), Quest4(self.ui), Quest5(self.ui), Quest6(self.ui)]
+        if quests is None:
+            quests = [Quest1(self.ui), Quest2(self.ui), Quest3(self.ui), Quest4(self.ui), Quest5(self.ui), Quest6(self.ui)]
+        self.quests = quests
         for quest in self.quests:
             quest.completion_callback = self.quest_completed
 
         # Set UI callback
         self.ui.start_quest_journey_callback = self.start_quest_journey
 
+        # Saved progress; the name screen suggests the last active player
+        self.progress_store = progress_store if progress_store is not None else ProgressStore()
+        self.progress_store.load()
+        self.leaderboard = Leaderboard.from_progress(self.progress_store.state)
+        self.restore_progress()
+
+    def restore_progress(self):
+        """
+        Prefills the name screen with the last active player. Their progress is loaded once the name is submitted,
+        so someone else at the same machine can enter their own name instead.
+        """
+        name = self.progress_store.active_player()
+        if name is not None:
+            self.ui.player_name.set(name)
+
+    def select_player(self, name):
+        """
+        Makes name the active player, restoring their saved points and quest position.
+        """
+        self.stop_current_quest()
+        self.load_player(name)
+        self.progress_store.record("player_started", self.player.name)
+        self.leaderboard.update(self.player.name, self.player.points, self.player.completed_mask)
+
+    def load_player(self, name):
+        """
+        Creates the player profile, with any progress saved under that name.
+        """
+        self.player = Player(name)
+        self.current_quest_index = 0
+        progress = self.progress_store.progress(name)
+        if progress:
+            self.player.points = progress["points"]
+            for quest_id in progress["completed_quests"]:
+                self.player.complete_quest(quest_id)
+            self.current_quest_index = progress["current_quest_index"]
+        self.ui.player_points.set(self.player.points)
+
     def start_game(self):
         """
         Launches the game by starting the user interface loop.
+        Attempts still buffered when the window closes are written out afterwards,
+        and the progress journal is folded into its snapshot.
         """
-        self.ui.run()
+        try:
+            self.ui.run()
+        finally:
+            self.events.flush(1.0)
+            self.telemetry.flush()
+            self.progress_store.close()
 
     def start_quest_journey(self):
         """
         Initializes the player's profile and starts the first or next quest.
         """
         if not self.player:
-            self.player = Player(self.ui.player_name.get())
-            self.ui.player_points.set(self.player.points)
+            self.select_player(self.ui.player_name.get())
         self.start_next_quest()
 
     def start_next_quest(self):
@@ -52,18 +116,39 @@ class GameEngine:
         if self.current_quest_index < len(self.quests):
             next_quest = self.quests[self.current_quest_index]
             next_quest.start()
+            self.events.publish(QuestStarted(next_quest.quest_id, self.player.name))
         else:
             self.ui.show_completion_message()
 
+    def stop_current_quest(self):
+        """
+        Cancels the pending timers and background work of the quest the player is leaving.
+        """
+        if self.current_quest_index < len(self.quests):
+            quest = self.quests[self.current_quest_index]
+            quest.stop()
+            # No timer may outlive its quest
+            leaked = self.ui.scheduler.active_count(quest)
+            if leaked:
+                logger.warning("Quest %d still has %d pending timers after stopping", quest.quest_id, leaked)
+
     def quest_completed(self, quest_id, difficulty):
         """
         Marks a quest as completed, updates player stats, and progresses to the next quest.
         """
+        # Ignore late completions, e.g. a delayed end_quest from a quest that was already left
+        if (self.current_quest_index >= len(self.quests)
+                or self.quests[self.current_quest_index].quest_id != quest_id):
+            return
+        self.stop_current_quest()
         self.player.complete_quest(quest_id)
         points_earned = difficulty * 10
         self.player.add_points(points_earned)
         self.ui.player_points.set(self.player.points)
         self.current_quest_index += 1
+        self.progress_store.record("quest_completed", self.player.name, quest_id=quest_id, points=points_earned)
+        self.leaderboard.update(self.player.name, self.player.points, self.player.completed_mask)
+        self.events.publish(QuestCompleted(quest_id, self.player.name, points=points_earned))
 
         # Proceed to the next quest
         self.start_next_quest()
@@ -72,13 +157,14 @@ class GameEngine:
         """
         Increment the quest index without updating player points.
         """
+        self.stop_current_quest()
+        if self.player and self.current_quest_index < len(self.quests):
+            self.events.publish(QuestSkipped(self.quests[self.current_quest_index].quest_id, self.player.name))
         self.current_quest_index += 1
+        if self.player:
+            self.progress_store.record("quest_skipped", self.player.name)
 
-        if self.current_quest_index < len(self.quests):
-            next_quest = self.quests[self.current_quest_index]
-            next_quest.start()
-        else:
-            self.ui.show_completion_message()
+        self.start_next_quest()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,65 @@
+# leaderboard.py
+
+from bisect import bisect_left, insort
+from typing import Dict, List, Optional, Tuple
+
+from player import quest_mask
+
+
+class Leaderboard:
+    def __init__(self):
+        """
+        In-memory index of all players ordered by points.
+        Entries are kept sorted as (-points, name), so rank lookups are a binary search and the top k is a slice.
+        """
+        self._order: List[Tuple[int, str]] = []
+        self._points: Dict[str, int] = {}
+        self._quests: Dict[str, int] = {}  # Bitset of completed quest ids per player
+
+    @classmethod
+    def from_progress(cls, state: Dict) -> "Leaderboard":
+        """
+        Builds the index from a ProgressStore state.
+        """
+        leaderboard = cls()
+        for name, progress in state["players"].items():
+            leaderboard._points[name] = progress["points"]
+            leaderboard._quests[name] = quest_mask(progress["completed_quests"])
+        leaderboard._order = sorted((-points, name) for name, points in leaderboard._points.items())
+        return leaderboard
+
+    def __len__(self) -> int:
+        return len(self._order)
+
+    def update(self, name: str, points: int, completed_mask: int) -> None:
+        """
+        Adds a player or moves them to their new position.
+        """
+        if name in self._points:
+            old = (-self._points[name], name)
+            del self._order[bisect_left(self._order, old)]
+        self._points[name] = points
+        self._quests[name] = completed_mask
+        insort(self._order, (-points, name))
+
+    def rank(self, name: str) -> Optional[int]:
+        """
+        1-based rank of a player; players with equal points share a rank.
+        """
+        if name not in self._points:
+            return None
+        return bisect_left(self._order, (-self._points[name], "")) + 1
+
+    def top(self, k: int) -> List[Tuple[int, str, int, int]]:
+        """
+        (rank, name, points, quests completed) for the k best players.
+        """
+        rows = []
+        for index, (negative_points, name) in enumerate(self._order[:k]):
+            # Ties share the rank of the first player with the same points
+            if rows and rows[-1][2] == -negative_points:
+                rank = rows[-1][0]
+            else:
+                rank = index + 1
+            rows.append((rank, name, -negative_points, bin(self._quests[name]).count("1")))
+        return rows
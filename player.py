@@ -1,6 +1,16 @@
 # player.py
 
-from typing import List
+from typing import Iterable, List
+
+
+def quest_mask(quest_ids: Iterable[int]) -> int:
+    """
+    Bitset with bit quest_id set for every quest in quest_ids.
+    """
+    mask = 0
+    for quest_id in quest_ids:
+        mask |= 1 << quest_id
+    return mask
 
 
 class Player:
@@ -10,7 +20,8 @@ class Player:
         """
         self.name: str = name
         self.points: int = 0
-        self.completed_quests: List[int] = []
+        self.completed_quests: List[int] = []  # In completion order
+        self.completed_mask: int = 0  # Bit quest_id is set once that quest is completed, for membership checks
 
     def add_points(self, points: int) -> None:
         """
@@ -23,12 +34,13 @@ class Player:
         Records a quest as completed by its ID.
         """
         self.completed_quests.append(quest_id)
+        self.completed_mask |= 1 << quest_id
 
     def has_completed_quest(self, quest_id: int) -> bool:
         """
         Checks if a quest has already been completed.
         """
-        return quest_id in self.completed_quests
+        return bool(self.completed_mask >> quest_id & 1)
 
     def reset(self) -> None:
         """
@@ -36,3 +48,4 @@ class Player:
         """
         self.points = 0
         self.completed_quests = []
+        self.completed_mask = 0
@@ -0,0 +1,133 @@
+# progress_store.py
+
+import json
+import os
+from typing import Dict, Optional
+
+DEFAULT_PROGRESS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "save_data")
+
+
+def empty_state() -> Dict:
+    return {"seq": 0, "active_player": None, "players": {}}
+
+
+def player_state(state: Dict, name: str) -> Dict:
+    """
+    Progress of one player, created on first use.
+    """
+    return state["players"].setdefault(name, {"points": 0, "completed_quests": [], "current_quest_index": 0})
+
+
+def apply_event(state: Dict, event: Dict) -> None:
+    """
+    Applies one journal event to the progress state.
+    """
+    progress = player_state(state, event["player"])
+    if event["type"] == "player_started":
+        state["active_player"] = event["player"]
+    elif event["type"] == "quest_completed":
+        progress["points"] += event["points"]
+        progress["completed_quests"].append(event["quest_id"])
+        progress["current_quest_index"] += 1
+    elif event["type"] == "quest_skipped":
+        progress["current_quest_index"] += 1
+    state["seq"] = event["seq"]
+
+
+class ProgressStore:
+    def __init__(self, directory: str = DEFAULT_PROGRESS_DIR):
+        """
+        Player progress kept as a snapshot plus an append-only journal of the events since.
+        Every event is one JSON line; the journal is folded into a new snapshot at load() and close(),
+        so loading only replays the events of one session.
+        """
+        self.directory = directory
+        self.snapshot_path = os.path.join(directory, "progress_snapshot.json")
+        self.journal_path = os.path.join(directory, "progress_journal.jsonl")
+        self.state = empty_state()
+        self._journal = None
+        self._pending = 0  # Journal lines since the last snapshot
+
+    def load(self) -> Dict:
+        """
+        Rebuilds the state from the snapshot and the journal and opens the journal for appending.
+        """
+        self.state = empty_state()
+        if os.path.exists(self.snapshot_path):
+            with open(self.snapshot_path, encoding="utf-8") as snapshot:
+                self.state = json.load(snapshot)
+
+        self._pending = 0
+        torn = False
+        if os.path.exists(self.journal_path):
+            with open(self.journal_path, encoding="utf-8") as journal:
+                for line in journal:
+                    try:
+                        event = json.loads(line)
+                    except json.JSONDecodeError:
+                        torn = True  # Torn last line from a crash mid-write
+                        break
+                    # Events already folded into the snapshot (crash between snapshot and truncation)
+                    if event["seq"] > self.state["seq"]:
+                        apply_event(self.state, event)
+                        self._pending += 1
+
+        # Fold the replayed events into a snapshot; this also drops a torn line before new events are appended
+        if self._pending or torn:
+            self.compact()
+        else:
+            self._open_journal()
+        return self.state
+
+    def _open_journal(self) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        if self._journal is None:
+            self._journal = open(self.journal_path, "a", encoding="utf-8")
+
+    def record(self, event_type: str, player: str, **fields) -> None:
+        """
+        Appends an event to the journal and applies it to the state.
+        The line is flushed to the operating system, which survives a crash of the game; no fsync,
+        so the completion path stays well under a millisecond. The snapshot is never written here.
+        """
+        self._open_journal()
+        event = dict(fields, seq=self.state["seq"] + 1, type=event_type, player=player)
+        self._journal.write(json.dumps(event, separators=(",", ":")) + "\n")
+        self._journal.flush()
+        apply_event(self.state, event)
+        self._pending += 1
+
+    def compact(self) -> None:
+        """
+        Writes the current state as the new snapshot and starts an empty journal.
+        Blocks on fsync, so it runs at load() and close() rather than on the completion path.
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        tmp_path = self.snapshot_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as snapshot:
+            json.dump(self.state, snapshot)
+            snapshot.flush()
+            os.fsync(snapshot.fileno())
+        os.replace(tmp_path, self.snapshot_path)
+
+        # The snapshot carries the last sequence number, so a crash before this truncation is harmless
+        if self._journal is not None:
+            self._journal.close()
+        self._journal = open(self.journal_path, "w", encoding="utf-8")
+        self._pending = 0
+
+    def close(self) -> None:
+        """
+        Folds this session's events into the snapshot and closes the journal; called when the game shuts down.
+        """
+        if self._pending:
+            self.compact()
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+
+    def active_player(self) -> Optional[str]:
+        return self.state["active_player"]
+
+    def progress(self, name: str) -> Optional[Dict]:
+        return self.state["players"].get(name)
@@ -2,8 +2,11 @@
 
 import tkinter as tk
 from tkinter import ttk
+from task_scheduler import CoalescedCall
 
 class Quest:
+    animate_replays = True  # False shows simulation replays at their final frame straight away (headless runs)
+
     def __init__(self, quest_id, description, difficulty, ui):
         """
         Base class for a quest.
@@ -20,6 +23,37 @@ class Quest:
         """
         raise NotImplementedError("Each quest must implement the 'start' method.")
 
+    def after(self, delay_ms, callback, *args):
+        """
+        Schedules callback(*args) on the Tk loop. The engine cancels pending callbacks when the player leaves the quest.
+        """
+        return self.ui.scheduler.after(self, delay_ms, callback, *args)
+
+    def cancel_task(self, job_id):
+        self.ui.scheduler.cancel(job_id)
+
+    def coalesced(self, callback):
+        """
+        Wraps callback for high-rate widget events such as tk.Scale commands: calls only mark it due,
+        and it runs at most once per display frame with whatever values are current by then.
+        """
+        return CoalescedCall(self.ui.scheduler, self, callback)
+
+    def stop(self):
+        """
+        Called by the engine when the player leaves the quest; cancels its pending callbacks.
+        Quests with background work override this to stop it as well.
+        """
+        self.ui.scheduler.cancel_owner(self)
+
+    def publish(self, event_class, **fields):
+        """
+        Publishes a lifecycle event (see event_bus) for this quest and the current player.
+        """
+        engine = self.ui.game_engine
+        if engine is not None:
+            engine.events.publish(event_class(self.quest_id, self.ui.player_name.get(), **fields))
+
     def end_quest(self):
         """
         Ends the quest and triggers the completion callback.
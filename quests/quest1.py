@@ -2,8 +2,9 @@
 
 import tkinter as tk
 from quests.quest import Quest
-from math import sqrt
+from event_bus import AttemptSubmitted
 from visualization import Visualization
+from quests.simulations import hypotenuse_correct
 from tkinter import ttk
 
 class Quest1(Quest):
@@ -18,12 +19,10 @@ class Quest1(Quest):
         self.b_min_value = 1.00
 
     def start(self):
-        # Destroy any existing widgets in content_frame
-        for widget in self.ui.content_frame.winfo_children():
-            widget.destroy()
-
-        self.quest_frame = tk.Frame(self.ui.content_frame)
-        self.quest_frame.pack(fill=tk.BOTH, expand=True)
+        # Hides the menu screens and replaces the previous quest's frame
+        self.quest_frame = self.ui.show_quest_frame()
+        # Slider drags fire on every pixel; redraw at most once per frame
+        self.request_plot_update = self.coalesced(self.update_plot)
 
         ttk.Label(self.quest_frame, text=self.description, style="Quest.Title.TLabel").pack(pady=20)
 
@@ -31,10 +30,10 @@ class Quest1(Quest):
         self.control_frame.pack(side=tk.LEFT, fill=tk.Y, padx=20)
 
         ttk.Label(self.control_frame, text="Adjust side a:", style="Quest.TLabel").pack(pady=5)
-        self.a_slider = tk.Scale(self.control_frame, from_=self.a_min_value, to=self.a_max_value, orient=tk.HORIZONTAL, variable=self.a_value, command=self.update_plot, length=200, resolution=0.1).pack(pady=5)
+        self.a_slider = tk.Scale(self.control_frame, from_=self.a_min_value, to=self.a_max_value, orient=tk.HORIZONTAL, variable=self.a_value, command=self.request_plot_update, length=200, resolution=0.1).pack(pady=5)
     
         ttk.Label(self.control_frame, text="Adjust side b:", style="Quest.TLabel").pack(pady=5)
-        self.b_slider = tk.Scale(self.control_frame, from_=self.b_min_value, to=self.b_max_value, orient=tk.HORIZONTAL, variable=self.b_value, command=self.update_plot, length=200, resolution=0.1).pack(pady=5)
+        self.b_slider = tk.Scale(self.control_frame, from_=self.b_min_value, to=self.b_max_value, orient=tk.HORIZONTAL, variable=self.b_value, command=self.request_plot_update, length=200, resolution=0.1).pack(pady=5)
 
         ttk.Label(self.control_frame, text="Enter the hypotenuse value:", style="Quest.TLabel").pack(pady=10)
         ttk.Entry(self.control_frame, textvariable=self.c_value).pack(pady=5)
@@ -56,17 +55,23 @@ class Quest1(Quest):
         Visualization.update_triangle_plot(self.canvas, self.line, self.side_a_label, self.side_b_label, self.a_value.get(), self.b_value.get())
 
     def check_answer(self):
+        # Draw the final slider position before the answer is judged against it
+        self.request_plot_update.flush()
         try:
             user_c = float(self.c_value.get())
         except ValueError:
+            self.publish(AttemptSubmitted, success=False, parameters={
+                "a": self.a_value.get(), "b": self.b_value.get(), "invalid_input": self.c_value.get()})
             self.display_message(self.quest_frame, "Please enter a valid number.", error=True)
             return
 
-        correct_c = sqrt(self.a_value.get() ** 2 + self.b_value.get() ** 2)
-        if abs(user_c - correct_c) < 0.01:
+        answer = {"a": self.a_value.get(), "b": self.b_value.get(), "c": user_c}
+        if hypotenuse_correct(**answer):
+            self.publish(AttemptSubmitted, success=True, parameters=answer)
             self.display_message(self.quest_frame, "Correct! Moving to the next quest.", success=True)
-            self.ui.root.after(2000, self.end_quest)  # Delay ending the quest
+            self.after(2000, self.end_quest)  # Delay ending the quest
         else:
+            self.publish(AttemptSubmitted, success=False, parameters=answer)
             self.display_message(self.quest_frame, "Incorrect. Try again.", error=True)
 
     def skip_quest(self):
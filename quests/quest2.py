@@ -2,8 +2,9 @@
 
 import tkinter as tk
 from quests.quest import Quest
-from math import degrees, atan
+from event_bus import AttemptSubmitted
 from visualization import Visualization
+from quests.simulations import triangle_angles_correct
 from tkinter import ttk
 
 class Quest2(Quest):
@@ -19,12 +20,10 @@ class Quest2(Quest):
         self.b_min_value = 1.00
 
     def start(self):
-        # Destroy any existing widgets in content_frame
-        for widget in self.ui.content_frame.winfo_children():
-            widget.destroy()
-
-        self.quest_frame = tk.Frame(self.ui.content_frame)
-        self.quest_frame.pack(fill=tk.BOTH, expand=True)
+        # Hides the menu screens and replaces the previous quest's frame
+        self.quest_frame = self.ui.show_quest_frame()
+        # Slider drags fire on every pixel; redraw at most once per frame
+        self.request_plot_update = self.coalesced(self.update_plot)
 
         ttk.Label(self.quest_frame, text=self.description, style="Quest.Title.TLabel").pack(pady=20)
 
@@ -32,10 +31,10 @@ class Quest2(Quest):
         self.control_frame.pack(side=tk.LEFT, fill=tk.Y, padx=20)
 
         ttk.Label(self.control_frame, text="Adjust side a:", style="Quest.TLabel").pack(pady=5)
-        self.a_slider = tk.Scale(self.control_frame, from_=self.a_min_value, to=self.a_max_value, orient=tk.HORIZONTAL, variable=self.a_value, command=self.update_plot, length=200, resolution=0.1).pack(pady=5)
+        self.a_slider = tk.Scale(self.control_frame, from_=self.a_min_value, to=self.a_max_value, orient=tk.HORIZONTAL, variable=self.a_value, command=self.request_plot_update, length=200, resolution=0.1).pack(pady=5)
     
         ttk.Label(self.control_frame, text="Adjust side b:", style="Quest.TLabel").pack(pady=5)
-        self.b_slider = tk.Scale(self.control_frame, from_=self.b_min_value, to=self.b_max_value, orient=tk.HORIZONTAL, variable=self.b_value, command=self.update_plot, length=200, resolution=0.1).pack(pady=5)
+        self.b_slider = tk.Scale(self.control_frame, from_=self.b_min_value, to=self.b_max_value, orient=tk.HORIZONTAL, variable=self.b_value, command=self.request_plot_update, length=200, resolution=0.1).pack(pady=5)
 
         ttk.Label(self.control_frame, text="Enter angle opposite side a:", style="Quest.TLabel").pack(pady=10)
         tk.Entry(self.control_frame, textvariable=self.angle_alpha).pack(pady=5)
@@ -60,21 +59,25 @@ class Quest2(Quest):
         Visualization.update_triangle_plot(self.canvas, self.line, self.side_a_label, self.side_b_label, self.a_value.get(), self.b_value.get())
 
     def check_answer(self):
+        # Draw the final slider position before the answer is judged against it
+        self.request_plot_update.flush()
         try:
             user_alpha = float(self.angle_alpha.get())
             user_beta = float(self.angle_beta.get())
         except ValueError:
+            self.publish(AttemptSubmitted, success=False, parameters={
+                "a": self.a_value.get(), "b": self.b_value.get(),
+                "invalid_input": f"{self.angle_alpha.get()}, {self.angle_beta.get()}"})
             self.display_message(self.quest_frame, "Please enter valid angles.", error=True)
             return
 
-        correct_alpha = degrees(atan(self.a_value.get() / self.b_value.get()))
-        correct_beta = degrees(atan(self.b_value.get() / self.a_value.get()))
-        tolerance = 0.5
-
-        if abs(user_alpha - correct_alpha) < tolerance and abs(user_beta - correct_beta) < tolerance:
+        answer = {"a": self.a_value.get(), "b": self.b_value.get(), "alpha": user_alpha, "beta": user_beta}
+        if triangle_angles_correct(**answer):
+            self.publish(AttemptSubmitted, success=True, parameters=answer)
             self.display_message(self.quest_frame, "Correct! Moving to the next quest.", success=True)
-            self.ui.root.after(2000, self.end_quest)  # Delay ending the quest
+            self.after(2000, self.end_quest)  # Delay ending the quest
         else:
+            self.publish(AttemptSubmitted, success=False, parameters=answer)
             self.display_message(self.quest_frame, "Incorrect angles. Try again.", error=True)
 
     def skip_quest(self):
@@ -2,14 +2,17 @@
 
 import numpy as np
 import random
+import time
 import tkinter as tk
 import matplotlib
 import matplotlib.pyplot as plt
 matplotlib.use('TkAgg')
 from quests.quest import Quest
+from event_bus import AttemptSubmitted, SimulationFinished
 from tkinter import ttk
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 from visualization import Visualization
+from quests.simulations import GRAVITY, projectile_hits
 
 class Quest3(Quest):
     def __init__(self, ui):
@@ -17,7 +20,7 @@ class Quest3(Quest):
         self.initial_speed = tk.DoubleVar(value=50.0)  # Initial speed in m/s
         self.launch_angle = tk.StringVar()  # Player's input for launch angle
         self.target_distance = tk.DoubleVar(value=random.uniform(100.0, 300.0))  # Distance to the target in meters
-        self.gravity = 9.8  # Acceleration due to gravity in m/s^2
+        self.gravity = GRAVITY  # Acceleration due to gravity in m/s^2
 
         # Variables for animation
         self.animation_running = False
@@ -26,12 +29,8 @@ class Quest3(Quest):
         self.y_coords = np.array([])
 
     def start(self):
-        # Clear the content_frame
-        for widget in self.ui.content_frame.winfo_children():
-            widget.destroy()
-
-        self.quest_frame = tk.Frame(self.ui.content_frame)
-        self.quest_frame.pack(fill=tk.BOTH, expand=True)
+        # Hides the menu screens and replaces the previous quest's frame
+        self.quest_frame = self.ui.show_quest_frame()
 
         ttk.Label(self.quest_frame, text=self.description, style="Quest.Title.TLabel").pack(pady=20)
 
@@ -77,8 +76,12 @@ class Quest3(Quest):
         try:
             angle_deg = float(self.launch_angle.get())
         except ValueError:
+            # Rejected before anything is fired, but still an attempt
+            self.publish(AttemptSubmitted, success=False, parameters={
+                "speed": self.initial_speed.get(), "invalid_input": self.launch_angle.get()})
             self.display_message("Please enter a valid angle.", error=True)
             return
+        self.fired_at = time.time()  # Reported with the outcome once the flight animation ends
 
         angle_rad = np.radians(angle_deg)
         v = self.initial_speed.get()
@@ -100,8 +103,10 @@ class Quest3(Quest):
 
         self.canvas.draw()
 
-        # Start the animation
-        self.animation_index = 0
+        # Start the animation, or go straight to its last frame when replays are not animated
+        below_ground = np.flatnonzero(self.y_coords < 0)
+        landed = below_ground[0] if below_ground.size else len(self.y_coords)
+        self.animation_index = 0 if self.animate_replays else max(landed - 1, 0)
         self.animation_running = True
         self.animate_projectile()
 
@@ -117,7 +122,7 @@ class Quest3(Quest):
 
             self.animation_index += 1
             # Schedule the next frame
-            self.ui.root.after(20, self.animate_projectile)
+            self.after(20, self.animate_projectile)
         else:
             self.animation_running = False
             # Animation is complete; call check_hit()
@@ -126,15 +131,13 @@ class Quest3(Quest):
     def check_hit(self):
         v = self.initial_speed.get()
         angle_deg = float(self.launch_angle.get())
-        angle_rad = np.radians(angle_deg)
-        g = self.gravity
-        t_flight = (2 * v * np.sin(angle_rad)) / g
-        max_distance = v * np.cos(angle_rad) * t_flight
-
-        if abs(max_distance - self.target_distance.get()) < 5.0:
+        hit = projectile_hits(v, angle_deg, self.target_distance.get(), g=self.gravity)
+        self.publish(SimulationFinished, success=hit, parameters={
+            "speed": v, "angle": angle_deg, "target_distance": self.target_distance.get()}, submitted_at=self.fired_at)
+        if hit:
             self.display_message("Hit! You've successfully hit the target!", success=True)
             # Proceed to end the quest after a short delay
-            self.ui.root.after(2000, self.end_quest)
+            self.after(2000, self.end_quest)
         else:
             self.display_message("Missed! Try adjusting your angle or speed.", error=True)
 
@@ -1,13 +1,16 @@
 #quests/quest4.py
 
 import matplotlib.pyplot as plt
-import numpy as np
+import time
 import tkinter as tk
 import matplotlib
 matplotlib.use('TkAgg')
 from quests.quest import Quest
+from event_bus import SimulationFinished
 from tkinter import ttk
 from visualization import Visualization
+from result_store import default_store
+from quests.simulations import simulate_tank_level, tank_level_success
 
 class Quest4(Quest):
     def __init__(self, ui):
@@ -16,13 +19,16 @@ class Quest4(Quest):
         self.kp = tk.DoubleVar(value=1.0)  # Proportional gain
         self.ki = tk.DoubleVar(value=0.1)
         self.kd = tk.DoubleVar(value=0.1)
-        self.integral_error = 0.0
         self.h1 = [0.0]
         self.water_level = [0.0]  # Initial water level in the controlled tank
         self.time_elapsed = 0.0
         self.simulation_running = False
         self.animation = None
         self.message_label = None
+        # Precomputed run shown by the animation
+        self.trajectory = None
+        self.trajectory_success = False
+        self.step_index = 0
         # Initialize data lists for plotting
         self.times = [0.0]
         self.kv_values = [0.0]
@@ -31,12 +37,8 @@ class Quest4(Quest):
         self.derivative_error_values = [0.0]
 
     def start(self):
-        # Clear the content_frame
-        for widget in self.ui.content_frame.winfo_children():
-            widget.destroy()
-
-        self.quest_frame = tk.Frame(self.ui.content_frame)
-        self.quest_frame.pack(fill=tk.BOTH, expand=True)
+        # Hides the menu screens and replaces the previous quest's frame
+        self.quest_frame = self.ui.show_quest_frame()
 
         ttk.Label(self.quest_frame, text=self.description, style="Quest.Title.TLabel").pack(pady=20)
 
@@ -77,6 +79,11 @@ class Quest4(Quest):
         self.kv_line, self.error_line, self.integral_error_line, self.derivative_error_line) = \
         Visualization.create_single_tank_control_plot(self.plot_frame, desired_level)
 
+    def set_sliders_state(self, state):
+        # The replay shows the run for the gains at Start, so the sliders are locked until it finishes or is reset
+        for slider in (self.kp_slider, self.ki_slider, self.kd_slider):
+            slider.configure(state=state)
+
     def start_simulation(self):
         if self.simulation_running:
             return  # Prevent multiple simulations at once
@@ -84,9 +91,6 @@ class Quest4(Quest):
         # Reset simulation parameters
         self.h1 = [0.0]  # Water level history for tank
         self.time_elapsed = 0.0
-        self.previous_error = 0.0
-        self.integral_error = 0.0
-        self.previous_h1 = 0.0
 
         # Reset data lists
         self.times = [0.0]
@@ -110,7 +114,16 @@ class Quest4(Quest):
         self.level_ax.set_ylim(0, 1.0)
         self.control_ax.set_xlim(0, 50)
         self.control_ax.set_ylim(auto=True)  # Let matplotlib autoscale the y-axis
+
+        # The sliders stay disabled during the replay, so the run can come from the precomputed store
+        params = {"kp": self.kp.get(), "ki": self.ki.get(), "kd": self.kd.get()}
+        self.trajectory, self.trajectory_success = default_store.fetch(
+            "tk.quest4", params, simulate_tank_level, tank_level_success)
+        self.run_params = params  # Reported with the outcome once the replay finishes
+        self.run_submitted_at = time.time()
+        self.step_index = 0
         self.simulation_running = True
+        self.set_sliders_state(tk.DISABLED)
 
         # Start the animation
         self.animate()
@@ -118,13 +131,11 @@ class Quest4(Quest):
     def reset_simulation(self):
         # Stop the simulation if it's running
         self.simulation_running = False
+        self.set_sliders_state(tk.NORMAL)
 
         # Reset simulation parameters
         self.h1 = [0.0]  # Water level history for tank
         self.time_elapsed = 0.0
-        self.previous_error = 0.0
-        self.integral_error = 0.0
-        self.previous_h1 = 0.0
 
         # Reset data lists
         self.times = [0.0]
@@ -162,75 +173,22 @@ class Quest4(Quest):
         if not self.simulation_running:
             return
 
-        # Simulation parameters
         dt = 0.1  # Time step
-        max_time = 50  # Maximum simulation time
-        A = 1.0  # Cross-sectional area of the tank
-        Kv_max = 0.5  # Maximum control signal
-        desired_level = self.desired_level
-
-        # Get player's proportional, integral, and derivative gains
-        Kp = self.kp.get()
-        Ki = self.ki.get()
-        Kd = self.kd.get()
-
-        # Current water level in tank
-        h1 = self.h1[-1]
-
-        # Inflow to tank
-        Q_in = 0.1  # Constant inflow
-
-        # Calculate error term
-        error = desired_level - h1
-
-        # Calculate derivative term based on error
-        if hasattr(self, "previous_error"):
-            derivative_error = (error - self.previous_error) / dt
-        else:
-            derivative_error = 0.0
-        self.previous_error = error
-
-        # Update integral error with anti-windup
-        if not (h1 >= 1.0 and error > 0):  # Assuming tank height is 1.0 m
-            self.integral_error += error * dt
-        self.integral_error = max(-10, min(self.integral_error, 10))  # Clamp integral error
 
-        # Feedforward term
-        Kv_ff = Q_in / np.sqrt(desired_level)
-
-        # Controller adjusts Kv (PID Control Signal)
-        Kv = Kv_ff + Kp * error + Ki * self.integral_error - Kd * derivative_error
-
-        # Limit control signal
-        Kv = max(0.0, min(Kv, Kv_max))
-
-        # Outflow from tank
-        Q_out = Kv * np.sqrt(max(h1, 0.0))  # Ensure h1 >= 0.0
-
-        # Differential equation
-        dh1_dt = (Q_in - Q_out) / A
-
-        # Update water level
-        h1_new = h1 + dh1_dt * dt
-
-        # Ensure water level is within bounds
-        h1_new = min(max(h1_new, 0.0), 1.0)  # Assuming tank height is 1.0 m
-
-        # Append new water level
-        self.h1.append(h1_new)
-
-        # Update time
-        self.time_elapsed += dt
-        self.times.append(self.time_elapsed)
-
-        # Append controller variables to lists
-        self.kv_values.append(Kv)
-        self.error_values.append(error)
-        self.integral_error_values.append(self.integral_error)
-        self.derivative_error_values.append(derivative_error)
+        # Reveal the next step of the precomputed run, or all of it when replays are not animated
+        self.step_index = self.step_index + 1 if self.animate_replays else len(self.trajectory["times"]) - 1
+        n = self.step_index + 1
+        data = self.trajectory
+        self.time_elapsed = data["times"][n - 1]
+        self.times = data["times"][:n]
+        self.h1 = data["h1"][:n]
+        self.kv_values = data["kv_values"][:n]
+        self.error_values = data["error_values"][:n]
+        self.integral_error_values = data["integral_error_values"][:n]
+        self.derivative_error_values = data["derivative_error_values"][:n]
 
         # Update visualization
-        self.update_water_tank(h1_new)
+        self.update_water_tank(self.h1[-1])
 
         # Update water level plot
         self.level_line.set_data(self.times, self.h1)
@@ -251,10 +209,11 @@ class Quest4(Quest):
         self.canvas.draw()
 
         # Continue simulation or check success
-        if self.time_elapsed < max_time:
-            self.ui.root.after(int(dt * 1000), self.animate)
+        if n < len(data["times"]):
+            self.after(int(dt * 1000), self.animate)
         else:
             self.simulation_running = False
+            self.set_sliders_state(tk.NORMAL)
             self.check_success()
 
     def update_water_tank(self, h1):
@@ -264,11 +223,11 @@ class Quest4(Quest):
 
     def check_success(self):
         # Check if the water level stabilized around the desired level
-        desired_level = self.desired_level
-        levels = np.array(self.h1[-50:])  # Check the last 50 readings
-        if np.all(np.abs(levels - desired_level) < 0.05):
+        self.publish(SimulationFinished, success=self.trajectory_success, parameters=self.run_params,
+                     submitted_at=self.run_submitted_at)
+        if self.trajectory_success:
             self.display_message("Success! The water level is stable.", success=True)
-            self.ui.root.after(2000, self.end_quest)
+            self.after(2000, self.end_quest)
         else:
             self.display_message("Try adjusting Kp to stabilize the level.", error=True)
 
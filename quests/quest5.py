@@ -2,11 +2,15 @@
 
 import matplotlib.pyplot as plt
 import numpy as np
+import time
 import tkinter as tk
 from quests.quest import Quest
+from event_bus import SimulationFinished
 from tkinter import ttk
 from visualization import Visualization
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+from result_store import default_store
+from quests.simulations import TARGET_POSITION, simulate_mass_spring_damper, mass_spring_damper_success
 
 class Quest5(Quest):
     def __init__(self, ui):
@@ -15,11 +19,15 @@ class Quest5(Quest):
         self.spring_const = tk.DoubleVar(value=1.0)  # Spring constant (K_s)
         self.damping_coeff = tk.DoubleVar(value=0.1)  # Damping coefficient (K_d)
         self.initial_displacement = tk.DoubleVar(value=0.0)  # Initial displacement
-        self.target_position = 10.0  # Target position where the mass should stop
+        self.target_position = TARGET_POSITION  # Target position where the mass should stop
         self.time_elapsed = 0.0
         self.simulation_running = False
         self.animation = None
         self.message_label = None
+        # Precomputed run shown by the animation
+        self.trajectory = None
+        self.trajectory_success = False
+        self.step_index = 0
 
         # Initialize data lists for plotting
         self.times = [0.0]
@@ -27,12 +35,8 @@ class Quest5(Quest):
         self.velocities = [0.0]  # Initial velocity is zero
 
     def start(self):
-        # Clear the content_frame
-        for widget in self.ui.content_frame.winfo_children():
-            widget.destroy()
-
-        self.quest_frame = tk.Frame(self.ui.content_frame)
-        self.quest_frame.pack(fill=tk.BOTH, expand=True)
+        # Hides the menu screens and replaces the previous quest's frame
+        self.quest_frame = self.ui.show_quest_frame()
 
         ttk.Label(self.quest_frame, text=self.description, style="Quest.Title.TLabel").pack(pady=20)
 
@@ -76,6 +80,11 @@ class Quest5(Quest):
         (self.canvas, self.fig, self.ax_animation, self.trolley, self.spring_line,
          self.ax_position, self.line_position, self.ax_phase, self.line_phase) = Visualization.create_mass_spring_damper_plots(self.plot_frame)
 
+    def set_sliders_state(self, state):
+        # The replay shows the run for the parameters at Start, so the sliders are locked until it finishes or is reset
+        for slider in (self.mass_slider, self.spring_slider, self.damping_slider, self.displacement_slider):
+            slider.configure(state=state)
+
     def start_simulation(self):
         if self.simulation_running:
             return  # Prevent multiple simulations at once
@@ -98,7 +107,20 @@ class Quest5(Quest):
         self.trolley.set_data([initial_x], [0])
         self.spring_line.set_data([], [])
 
+        # The sliders stay disabled during the replay, so the run can come from the precomputed store
+        params = {
+            "mass": self.mass.get(),
+            "spring_const": self.spring_const.get(),
+            "damping_coeff": self.damping_coeff.get(),
+            "initial_displacement": self.initial_displacement.get(),
+        }
+        self.trajectory, self.trajectory_success = default_store.fetch(
+            "tk.quest5", params, simulate_mass_spring_damper, mass_spring_damper_success)
+        self.run_params = params  # Reported with the outcome once the replay finishes
+        self.run_submitted_at = time.time()
+        self.step_index = 0
         self.simulation_running = True
+        self.set_sliders_state(tk.DISABLED)
 
         # Start the animation
         self.animate()
@@ -106,6 +128,7 @@ class Quest5(Quest):
     def reset_simulation(self):
         # Stop the simulation if it's running
         self.simulation_running = False
+        self.set_sliders_state(tk.NORMAL)
 
         # Reset simulation parameters
         self.time_elapsed = 0.0
@@ -137,42 +160,17 @@ class Quest5(Quest):
         if not self.simulation_running:
             return
 
-        # Simulation parameters
         dt = 0.01  # Time step
-        max_time = 10.0  # Maximum simulation time
-
-        # Retrieve parameters from sliders
-        m = self.mass.get()
-        K_s = self.spring_const.get()
-        K_d = self.damping_coeff.get()
-
-        # Current state
-        t = self.times[-1]
-        x = self.positions[-1]
-        v = self.velocities[-1]
-
-        # Shift the reference to start at initial position
-        x_shifted = x - self.initial_displacement.get()
 
-        # Target position relative to initial position
-        x_target = self.target_position - self.initial_displacement.get()
-
-        # Apply external force to move towards the target position
-        # For simplicity, we can model the target position as an equilibrium point of the spring
-        # Modify the spring force to be: F_spring = -K_s * (x - x_target)
-        a = (-K_d * v - K_s * (x - x_target)) / m
-
-        # Update velocity and position using Euler's method
-        v_new = v + a * dt
-        x_new = x + v_new * dt
-
-        # Update time
-        t_new = t + dt
-
-        # Append new values
-        self.times.append(t_new)
-        self.positions.append(x_new)
-        self.velocities.append(v_new)
+        # Reveal the next step of the precomputed run, or all of it when replays are not animated
+        self.step_index = self.step_index + 1 if self.animate_replays else len(self.trajectory["times"]) - 1
+        n = self.step_index + 1
+        data = self.trajectory
+        self.times = data["times"][:n]
+        self.positions = data["positions"][:n]
+        self.velocities = data["velocities"][:n]
+        t_new = self.times[-1]
+        x_new = self.positions[-1]
 
         # Update trolley animation
         self.trolley.set_data([x_new], [0])  # Trolley moves along x-axis at y=0
@@ -188,34 +186,31 @@ class Quest5(Quest):
         # Update displacement over time plot
         self.line_position.set_data(self.times, self.positions)
         self.ax_position.set_xlim(0, max(10, t_new))
-        self.ax_position.set_ylim(min(self.positions) - 1, max(self.positions) + 1)
+        self.ax_position.set_ylim(self.positions.min() - 1, self.positions.max() + 1)
 
         # Update phase plot
         self.line_phase.set_data(self.positions, self.velocities)
-        self.ax_phase.set_xlim(min(self.positions) - 1, max(self.positions) + 1)
-        self.ax_phase.set_ylim(min(self.velocities) - 1, max(self.velocities) + 1)
+        self.ax_phase.set_xlim(self.positions.min() - 1, self.positions.max() + 1)
+        self.ax_phase.set_ylim(self.velocities.min() - 1, self.velocities.max() + 1)
 
         # Redraw canvas
         self.canvas.draw()
 
         # Continue simulation or stop
-        if t_new < max_time:
-            self.ui.root.after(int(dt * 1000), self.animate)
+        if n < len(data["times"]):
+            self.after(int(dt * 1000), self.animate)
         else:
             self.simulation_running = False
+            self.set_sliders_state(tk.NORMAL)
             self.check_success()
 
     def check_success(self):
         # Check if the mass has stopped at the target position within a tolerance
-        final_velocity = self.velocities[-1]
-        final_position = self.positions[-1]
-        position_error = abs(final_position - self.target_position)
-        velocity_threshold = 0.05  # Threshold for considering the mass as stopped
-        position_tolerance = 0.1   # Acceptable distance from target position
-
-        if abs(final_velocity) < velocity_threshold and position_error < position_tolerance:
+        self.publish(SimulationFinished, success=self.trajectory_success, parameters=self.run_params,
+                     submitted_at=self.run_submitted_at)
+        if self.trajectory_success:
             self.display_message("Success! The mass has stopped at the target position.", success=True)
-            self.ui.root.after(2000, self.end_quest)
+            self.after(2000, self.end_quest)
         else:
             self.display_message("Adjust parameters to stop the mass at the target position.", error=True)
 
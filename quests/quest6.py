@@ -2,10 +2,14 @@
 
 import matplotlib.pyplot as plt
 import numpy as np
+import time
 import tkinter as tk
 from quests.quest import Quest
+from event_bus import SimulationFinished
 from tkinter import ttk
 from visualization import Visualization
+from result_store import default_store
+from quests.simulations import simulate_inverted_pendulum, inverted_pendulum_success
 
 class Quest6(Quest):
     def __init__(self, ui):
@@ -23,26 +27,24 @@ class Quest6(Quest):
 
         # State variables
         self.x = [0.0]          # Cart position
-        self.x_dot = [0.0]      # Cart velocity
         self.theta = [0.05]     # Pendulum angle (radians), small initial angle
-        self.theta_dot = [0.0]  # Pendulum angular velocity
 
         self.time_elapsed = 0.0
         self.simulation_running = False
         self.animation = None
         self.message_label = None
+        # Precomputed run shown by the animation
+        self.trajectory = None
+        self.trajectory_success = False
+        self.step_index = 0
 
         # Data for plotting
         self.times = [0.0]
         self.control_forces = [0.0]
     
     def start(self):
-        # Clear the content_frame
-        for widget in self.ui.content_frame.winfo_children():
-            widget.destroy()
-
-        self.quest_frame = tk.Frame(self.ui.content_frame)
-        self.quest_frame.pack(fill=tk.BOTH, expand=True)
+        # Hides the menu screens and replaces the previous quest's frame
+        self.quest_frame = self.ui.show_quest_frame()
 
         ttk.Label(self.quest_frame, text=self.description, style="Quest.Title.TLabel").pack(pady=20)
 
@@ -80,6 +82,11 @@ class Quest6(Quest):
         (self.canvas, self.fig, self.ax_animation, self.cart_patch, self.pendulum_line,
          self.ax_angle, self.line_angle, self.ax_force, self.line_force) = Visualization.create_inverted_pendulum_plot(self.plot_frame)
     
+    def set_sliders_state(self, state):
+        # The replay shows the run for the gains at Start, so the sliders are locked until it finishes
+        for slider in (self.kp_theta_slider, self.ki_theta_slider, self.kd_theta_slider):
+            slider.configure(state=state)
+
     def start_simulation(self):
         if self.simulation_running:
             return  # Prevent multiple simulations at once
@@ -88,12 +95,8 @@ class Quest6(Quest):
         self.time_elapsed = 0.0
         self.times = [0.0]
         self.x = [0.0]
-        self.x_dot = [0.0]
         self.theta = [0.05]  # Small initial angle in radians
-        self.theta_dot = [0.0]
         self.control_forces = [0.0]
-        self.integral_error = 0.0
-        self.previous_error = 0.0
 
         # Reset plots
         self.line_angle.set_data([], [])
@@ -103,7 +106,15 @@ class Quest6(Quest):
         self.ax_force.set_xlim(0, 10)
         self.ax_force.set_ylim(-50, 50)
 
+        # The sliders stay disabled during the replay, so the run can come from the precomputed store
+        params = {"kp_theta": self.kp_theta.get(), "ki_theta": self.ki_theta.get(), "kd_theta": self.kd_theta.get()}
+        self.trajectory, self.trajectory_success = default_store.fetch(
+            "tk.quest6", params, simulate_inverted_pendulum, inverted_pendulum_success)
+        self.run_params = params  # Reported with the outcome once the replay finishes
+        self.run_submitted_at = time.time()
+        self.step_index = 0
         self.simulation_running = True
+        self.set_sliders_state(tk.DISABLED)
 
         # Start the animation
         self.animate()
@@ -116,12 +127,8 @@ class Quest6(Quest):
         self.time_elapsed = 0.0
         self.times = [0.0]
         self.x = [0.0]
-        self.x_dot = [0.0]
         self.theta = [0.05]  # Small initial angle in radians
-        self.theta_dot = [0.0]
         self.control_forces = [0.0]
-        self.integral_error = 0.0
-        self.previous_error = 0.0
 
         # Reset plots
         self.line_angle.set_data([], [])
@@ -143,60 +150,19 @@ class Quest6(Quest):
         if not self.simulation_running:
             return
 
-        # Simulation parameters
         dt = 0.02  # Time step
-        max_time = 10.0  # Maximum simulation time
-
-        # Retrieve controller gains
-        Kp_theta = self.kp_theta.get()
-        Ki_theta = self.ki_theta.get()
-        Kd_theta = self.kd_theta.get()
-
-        # Current state
-        x = self.x[-1]
-        x_dot = self.x_dot[-1]
-        theta = self.theta[-1]
-        theta_dot = self.theta_dot[-1]
-
-        # Error for controller (theta should be zero)
-        error = 0.0 - theta
-        self.integral_error += error * dt
-        derivative_error = (error - self.previous_error) / dt
-        self.previous_error = error
-
-        # Control force (PID controller)
-        u = Kp_theta * error + Ki_theta * self.integral_error + Kd_theta * derivative_error
-
-        # Limit control force
-        u = max(-100.0, min(u, 100.0))
-
-        # Equations of motion (linearized)
-        m_c = self.m_c
-        m_p = self.m_p
-        l = self.l
-        g = self.g
-
-        # Compute accelerations
-        theta_double_dot = (g * theta + u / (m_c + m_p)) / l
-        x_double_dot = u / (m_c + m_p)
-
-        # Update velocities and positions using Euler's method
-        theta_dot_new = theta_dot + theta_double_dot * dt
-        theta_new = theta + theta_dot_new * dt
-
-        x_dot_new = x_dot + x_double_dot * dt
-        x_new = x + x_dot_new * dt
-
-        # Update time
-        self.time_elapsed += dt
-
-        # Append new values
-        self.times.append(self.time_elapsed)
-        self.x.append(x_new)
-        self.x_dot.append(x_dot_new)
-        self.theta.append(theta_new)
-        self.theta_dot.append(theta_dot_new)
-        self.control_forces.append(u)
+
+        # Reveal the next step of the precomputed run, or all of it when replays are not animated
+        self.step_index = self.step_index + 1 if self.animate_replays else len(self.trajectory["times"]) - 1
+        n = self.step_index + 1
+        data = self.trajectory
+        self.time_elapsed = data["times"][n - 1]
+        self.times = data["times"][:n]
+        self.x = data["x"][:n]
+        self.theta = data["theta"][:n]
+        self.control_forces = data["control_forces"][:n]
+        x_new = self.x[-1]
+        theta_new = self.theta[-1]
 
         # Update animation
         self.update_animation(x_new, theta_new)
@@ -208,16 +174,17 @@ class Quest6(Quest):
 
         self.line_force.set_data(self.times, self.control_forces)
         self.ax_force.set_xlim(0, max(10, self.time_elapsed))
-        self.ax_force.set_ylim(min(self.control_forces) - 10, max(self.control_forces) + 10)
+        self.ax_force.set_ylim(self.control_forces.min() - 10, self.control_forces.max() + 10)
 
         # Redraw canvas
         self.canvas.draw()
 
         # Continue simulation or check success
-        if self.time_elapsed < max_time:
-            self.ui.root.after(int(dt * 1000), self.animate)
+        if n < len(data["times"]):
+            self.after(int(dt * 1000), self.animate)
         else:
             self.simulation_running = False
+            self.set_sliders_state(tk.NORMAL)
             self.check_success()
 
     def update_animation(self, x, theta):
@@ -233,15 +200,12 @@ class Quest6(Quest):
 
 
     def check_success(self):
-        # Check if the pendulum remained upright within a tolerance
-        upright_tolerance = 0.05  # Radians (~2.86 degrees)
-        duration = 2.0  # Seconds the pendulum must remain upright
-
-        # Check if the pendulum angle stayed within tolerance for the last 'duration' seconds
-        indices = [i for i, t in enumerate(self.times) if t >= self.time_elapsed - duration]
-        if all(abs(self.theta[i]) < upright_tolerance for i in indices):
+        # Check if the pendulum remained upright within a tolerance (~2.86 degrees) for the last 2 seconds
+        self.publish(SimulationFinished, success=self.trajectory_success, parameters=self.run_params,
+                     submitted_at=self.run_submitted_at)
+        if self.trajectory_success:
             self.display_message("Success! You've balanced the pendulum.", success=True)
-            self.ui.root.after(2000, self.end_quest)
+            self.after(2000, self.end_quest)
         else:
             self.display_message("The pendulum fell. Try adjusting the controller gains.", error=True)
 
@@ -2,14 +2,23 @@
 
 import tkinter as tk
 from quests.quest import Quest
+from event_bus import SimulationFinished
 from tkinter import ttk
 import numpy as np
 import matplotlib.pyplot as plt
 from visualization import Visualization
-from sklearn.datasets import load_digits
-from sklearn.model_selection import train_test_split
-from PIL import Image, ImageOps
-import io
+from quests.quest7_training import (OPTIMIZERS, TrainingEngine, TrainingWorker, init_params, init_stacked_params,
+                                    predict_proba, unstack_optimizer_state, unstack_params)
+from quests.quest7_data import load_digits_split
+from quests.quest7_checkpoints import checkpoint_path, load_checkpoint, save_checkpoint
+from quests.quest7_quantize import QUANTIZED_MODEL_PATH, accuracy_report, format_report, quantize_model, save_quantized
+from quests.quest7_canvas import CANVAS_SIZE, DigitRaster
+import queue
+
+# Settings trained side by side by "Compare Settings"
+COMPARE_LEARNING_RATES = (0.001, 0.01, 0.1)
+COMPARE_HIDDEN_SIZES = (32, 64, 128)
+STROKE_POINTS_PER_LINE = 64  # A stroke continues in a new polyline after this many points
 
 class Quest7(Quest):
     def __init__(self, ui):
@@ -17,7 +26,13 @@ class Quest7(Quest):
         # Hyperparameters
         self.lr = tk.DoubleVar(value=0.01)
         self.hidden_size = tk.IntVar(value=64)
+        self.conv_filters = tk.IntVar(value=0)  # 0 disables the convolution layer
         self.epochs = tk.IntVar(value=10)
+        self.batch_size = tk.IntVar(value=32)
+        self.optimizer_name = tk.StringVar(value="Adam")
+        self.augment = tk.BooleanVar(value=False)
+        self.engine = None
+        self.training_worker = None
         # Initialize network parameters (weights and biases)
         self.init_network()
         # Load data
@@ -28,6 +43,7 @@ class Quest7(Quest):
         self.train_accuracies = []
         self.val_accuracies = []
         self.training_epoch = 0
+        self.max_epochs = 0  # Epoch the current run stops at, counting epochs of a continued checkpoint
         self.simulation_running = False
         # Visualization elements
         self.canvas = None
@@ -38,18 +54,23 @@ class Quest7(Quest):
         self.line_val_loss = None
         self.line_train_acc = None
         self.line_val_acc = None
+        # Compare Settings mode
+        self.compare_settings = [(lr, hidden) for lr in COMPARE_LEARNING_RATES for hidden in COMPARE_HIDDEN_SIZES]
+        self.compare_history = []
+        self.leaderboard = None
         # Drawing canvas for user input
         self.drawing_canvas = None
-        self.user_digit = None
+        self.raster = DigitRaster()
+        self.stroke_item = None  # Polyline of the stroke being drawn
+        self.stroke_points = []
         self.prediction_label = None
+        self.request_prediction = None
 
     def start(self):
-        # Clear the content_frame
-        for widget in self.ui.content_frame.winfo_children():
-            widget.destroy()
-    
-        self.quest_frame = tk.Frame(self.ui.content_frame)
-        self.quest_frame.pack(fill=tk.BOTH, expand=True)
+        # Hides the menu screens and replaces the previous quest's frame
+        self.quest_frame = self.ui.show_quest_frame()
+        # Motion events arrive much faster than the screen refreshes; run at most one prediction per frame
+        self.request_prediction = self.coalesced(self.test_user_digit)
     
         ttk.Label(self.quest_frame, text=self.description, style="Quest.Title.TLabel").pack(pady=20)
     
@@ -64,12 +85,29 @@ class Quest7(Quest):
         ttk.Label(self.control_frame, text="Hidden Neurons:", style="Quest.TLabel").pack(pady=5)
         self.hidden_size_slider = tk.Scale(self.control_frame, from_=10, to=200, orient=tk.HORIZONTAL, variable=self.hidden_size, length=200, resolution=1)
         self.hidden_size_slider.pack(pady=5)
+
+        ttk.Label(self.control_frame, text="Conv Filters (0 = off):", style="Quest.TLabel").pack(pady=5)
+        self.conv_filters_slider = tk.Scale(self.control_frame, from_=0, to=16, orient=tk.HORIZONTAL, variable=self.conv_filters, length=200, resolution=1)
+        self.conv_filters_slider.pack(pady=5)
+
+        ttk.Label(self.control_frame, text="Batch Size:", style="Quest.TLabel").pack(pady=5)
+        self.batch_size_slider = tk.Scale(self.control_frame, from_=8, to=512, orient=tk.HORIZONTAL, variable=self.batch_size, length=200, resolution=8)
+        self.batch_size_slider.pack(pady=5)
+
+        ttk.Label(self.control_frame, text="Optimizer:", style="Quest.TLabel").pack(pady=5)
+        self.optimizer_menu = ttk.Combobox(self.control_frame, textvariable=self.optimizer_name, values=list(OPTIMIZERS), state="readonly", width=12)
+        self.optimizer_menu.pack(pady=5)
+    
+        ttk.Checkbutton(self.control_frame, text="Augment Training Digits", variable=self.augment).pack(pady=5)
     
         ttk.Label(self.control_frame, text="Epochs:", style="Quest.TLabel").pack(pady=5)
         self.epochs_slider = tk.Scale(self.control_frame, from_=1, to=50, orient=tk.HORIZONTAL, variable=self.epochs, length=200, resolution=1)
         self.epochs_slider.pack(pady=5)
     
         ttk.Button(self.control_frame, text="Start Training", command=self.start_training, style="Quest.TButton").pack(pady=10)
+        ttk.Button(self.control_frame, text="Continue Training", command=self.continue_training, style="Quest.TButton").pack(pady=10)
+        ttk.Button(self.control_frame, text="Export Int8 Model", command=self.export_quantized_model, style="Quest.TButton").pack(pady=10)
+        ttk.Button(self.control_frame, text="Compare Settings", command=self.start_comparison, style="Quest.TButton").pack(pady=10)
         ttk.Button(self.control_frame, text="Reset Training", command=self.reset_training, style="Quest.TButton").pack(pady=10)
         ttk.Button(self.control_frame, text="Skip Quest", command=self.skip_quest, style="Quest.TButton").pack(pady=10)
     
@@ -80,45 +118,63 @@ class Quest7(Quest):
         # Message Label
         self.message_label = None
     
-        # Plot area
+        # Plot area, with a tab for the current run and one for comparing settings
         self.plot_frame = tk.Frame(self.quest_frame)
         self.plot_frame.pack(side=tk.RIGHT, fill=tk.BOTH, expand=True)
+        self.plot_tabs = ttk.Notebook(self.plot_frame)
+        self.plot_tabs.pack(fill=tk.BOTH, expand=True)
+        self.training_tab = tk.Frame(self.plot_tabs)
+        self.compare_tab = tk.Frame(self.plot_tabs)
+        self.plot_tabs.add(self.training_tab, text="Training")
+        self.plot_tabs.add(self.compare_tab, text="Compare Settings")
     
-        # Initialize the plot
+        # Initialize the plots
         self.create_plot()
+        self.create_comparison_panel()
 
     def create_plot(self):
         (self.canvas, self.fig,
         self.ax_loss, self.line_train_loss,
         self.ax_val_loss, self.line_val_loss,
         self.ax_accuracy, self.line_train_acc,
-        self.ax_val_acc, self.line_val_acc) = Visualization.create_loss_accuracy_plots(self.plot_frame)
+        self.ax_val_acc, self.line_val_acc) = Visualization.create_loss_accuracy_plots(self.training_tab)
+
+    def create_comparison_panel(self):
+        # Leaderboard of the compared settings, next to their validation curves
+        leaderboard_frame = tk.Frame(self.compare_tab)
+        leaderboard_frame.pack(side=tk.LEFT, fill=tk.Y, padx=10, pady=10)
+        ttk.Label(leaderboard_frame, text="Leaderboard", style="Quest.TLabel").pack(pady=5)
+        columns = ("rank", "lr", "hidden", "val_acc", "val_loss")
+        self.leaderboard = ttk.Treeview(leaderboard_frame, columns=columns, show="headings", height=len(self.compare_settings))
+        for column, heading, width in zip(columns, ("#", "Learning Rate", "Hidden", "Val Acc", "Val Loss"), (30, 90, 60, 70, 70)):
+            self.leaderboard.heading(column, text=heading)
+            self.leaderboard.column(column, width=width, anchor=tk.CENTER)
+        self.leaderboard.pack(fill=tk.Y, expand=True)
+
+        curves_frame = tk.Frame(self.compare_tab)
+        curves_frame.pack(side=tk.RIGHT, fill=tk.BOTH, expand=True)
+        labels = [f"lr={lr}, hidden={hidden}" for lr, hidden in self.compare_settings]
+        (self.compare_canvas, self.compare_fig,
+        self.ax_compare_loss, self.compare_loss_lines,
+        self.ax_compare_acc, self.compare_acc_lines) = Visualization.create_model_comparison_plots(curves_frame, labels)
 
     def init_network(self):
         input_size = 64  # Adjusted for 8x8 images from the digits dataset
         output_size = 10  # 10 classes
         hidden_size = self.hidden_size.get()
-        # Initialize weights and biases
-        self.W1 = np.random.randn(input_size, hidden_size) * 0.01
-        self.b1 = np.zeros((1, hidden_size))
-        self.W2 = np.random.randn(hidden_size, output_size) * 0.01
-        self.b2 = np.zeros((1, output_size))
+        # Initialize weights and biases (W1, b1, W2, b2, plus Wc, bc for the optional conv layer)
+        self.params = init_params(input_size, hidden_size, output_size, conv_filters=self.conv_filters.get())
 
     def load_data(self):
-        # Load digits dataset
-        digits = load_digits()
-        X = digits.images  # Shape (1797, 8, 8)
-        y = digits.target  # Shape (1797,)
-        # Flatten images
-        X = X.reshape(-1, 64)
-        # Normalize pixel values
-        X = X / 16.0
-        # Split into training and validation sets
-        self.X_train, self.X_val, self.y_train, self.y_val = train_test_split(X, y, test_size=0.2, random_state=42)
+        # Normalized 8x8 digits split into training and validation sets, memory-mapped from the on-disk cache
+        self.X_train, self.X_val, self.y_train, self.y_val = load_digits_split()
 
     def reset_training(self):
-        # Stop any ongoing training
+        # Stop any ongoing training; the worker exits after its current batch
         self.simulation_running = False
+        if self.training_worker:
+            self.training_worker.cancel()
+            self.training_worker = None
         
         # Reinitialize network parameters
         self.init_network()
@@ -150,6 +206,10 @@ class Quest7(Quest):
         # Redraw plots
         self.canvas.draw()
         
+        # Clear the comparison
+        self.compare_history = []
+        self.update_comparison()
+        
         # Clear any existing messages
         if self.message_label:
             self.message_label.destroy()
@@ -161,163 +221,111 @@ class Quest7(Quest):
         drawing_frame.pack(pady=10)
         
         # Canvas for drawing
-        self.drawing_canvas = tk.Canvas(drawing_frame, width=200, height=200, bg='white', cursor='cross')
+        self.drawing_canvas = tk.Canvas(drawing_frame, width=CANVAS_SIZE, height=CANVAS_SIZE, bg='white', cursor='cross')
         self.drawing_canvas.pack()
         
         # Bind mouse events to the canvas
+        self.drawing_canvas.bind("<ButtonPress-1>", self.start_stroke)
         self.drawing_canvas.bind("<B1-Motion>", self.draw)
+        self.drawing_canvas.bind("<ButtonRelease-1>", self.end_stroke)
         
-        # Buttons for clearing and testing the drawing
+        # Button for clearing the drawing; predictions update while drawing
         button_frame = tk.Frame(self.control_frame)
         button_frame.pack(pady=5)
         
         clear_button = ttk.Button(button_frame, text="Clear Drawing", command=self.clear_drawing, style="Quest.TButton")
         clear_button.pack(side=tk.LEFT, padx=5)
         
-        test_button = ttk.Button(button_frame, text="Test Your Digit", command=self.test_user_digit, style="Quest.TButton")
-        test_button.pack(side=tk.LEFT, padx=5)
-        
         # Prediction result label
-        self.prediction_label = ttk.Label(self.control_frame, text="Draw a digit and click 'Test Your Digit'", style='Quest.TLabel')
+        self.prediction_label = ttk.Label(self.control_frame, text="Draw a digit to see the prediction", style='Quest.TLabel')
         self.prediction_label.pack(pady=5)
         
+    def new_polyline(self, x, y):
+        # A smoothed polyline starting at (x, y), extended in place as the mouse moves
+        self.stroke_points = [x, y, x, y]
+        self.stroke_item = self.drawing_canvas.create_line(*self.stroke_points, width=2 * self.raster.brush_radius,
+                                                           fill='black', capstyle=tk.ROUND, joinstyle=tk.ROUND,
+                                                           smooth=True)
+
+    def start_stroke(self, event):
+        x, y = event.x, event.y
+        self.new_polyline(x, y)
+        self.raster.stamp(x, y)
+        self.request_prediction()
+
     def draw(self, event):
-        # Draw a small oval (dot) where the mouse moves
+        if self.stroke_item is None:
+            self.start_stroke(event)
+            return
         x, y = event.x, event.y
-        r = 4  # Radius of the dot
-        self.drawing_canvas.create_oval(x - r, y - r, x + r, y + r, fill='black')
+        x0, y0 = self.stroke_points[-2:]
+        if len(self.stroke_points) >= 2 * STROKE_POINTS_PER_LINE:
+            # Continue in a fresh polyline, so coords() never resends more than a bounded number of points
+            self.new_polyline(x0, y0)
+        self.stroke_points.extend((x, y))
+        self.drawing_canvas.coords(self.stroke_item, *self.stroke_points)
+        self.raster.stroke(x0, y0, x, y)
+        self.request_prediction()
+
+    def end_stroke(self, event):
+        self.stroke_item = None
+        self.stroke_points = []
         
     def clear_drawing(self):
+        self.request_prediction.cancel()
         self.drawing_canvas.delete("all")
-        self.prediction_label.config(text="Draw a digit and click 'Test Your Digit'")
+        self.stroke_item = None
+        self.stroke_points = []
+        self.raster.clear()
+        self.prediction_label.config(text="Draw a digit to see the prediction")
         
     def test_user_digit(self):
-        # Get the drawing from the canvas
-        self.drawing_canvas.update()
-        ps = self.drawing_canvas.postscript(colormode='color')
-        
-        # Convert postscript image to PIL Image
-        img = Image.open(io.BytesIO(ps.encode('utf-8')))
-        
-        # Convert to grayscale
-        img = img.convert('L')
-        
-        # Invert image (PIL uses white as background)
-        img = ImageOps.invert(img)
-        
-        # Resize to 8x8 as per the digits dataset
-        img = img.resize((8, 8), Image.ANTIALIAS)
+        if not self.prediction_label.winfo_exists():
+            return  # The quest screen was closed before the prediction ran
         
-        # Convert image to numpy array
-        img_array = np.array(img)
+        # 8x8 block average of the raster kept by draw(), scaled like the digits dataset
+        X_test = self.raster.features()
         
-        # Normalize pixel values to [0,1]
-        img_array = img_array / 255.0
+        # Forward pass on the float network; for a single drawing it is faster than the int8 export in numpy
+        probabilities = predict_proba(self.params, X_test)[0]
         
-        # Flatten the image
-        img_flat = img_array.flatten()
-        
-        # Reduce the resolution to match the digits dataset (optional)
-        # The digits dataset has 8x8 images with pixel values from 0 to 16
-        img_flat = (img_flat * 16).astype(int)
-        
-        # Prepare input for the network
-        X_test = img_flat.reshape(1, -1) / 16.0  # Normalize
-        
-        # Forward pass
-        z1 = np.dot(X_test, self.W1) + self.b1
-        a1 = self.relu(z1)
-        z2 = np.dot(a1, self.W2) + self.b2
-        a2 = self.softmax(z2)
-        
-        # Prediction
-        prediction = np.argmax(a2, axis=1)[0]
+        # Three most likely digits, best first
+        top3 = np.argsort(probabilities)[::-1][:3]
+        guesses = "  ".join(f"{digit}: {probabilities[digit]:.0%}" for digit in top3)
         
         # Update prediction label
-        self.prediction_label.config(text=f"Predicted Digit: {prediction}")
-
-    def train_epoch(self):
-        # Retrieve hyperparameters
-        learning_rate = self.lr.get()
-        hidden_size = self.hidden_size.get()
-        
-        # Shuffle training data
-        permutation = np.random.permutation(self.X_train.shape[0])
-        X_train_shuffled = self.X_train[permutation]
-        y_train_shuffled = self.y_train[permutation]
-        
-        # One-hot encode labels
-        y_train_one_hot = np.zeros((y_train_shuffled.size, 10))
-        y_train_one_hot[np.arange(y_train_shuffled.size), y_train_shuffled] = 1
-        
-        # Forward pass
-        z1 = np.dot(X_train_shuffled, self.W1) + self.b1  # (N, hidden_size)
-        a1 = self.relu(z1)                               # (N, hidden_size)
-        z2 = np.dot(a1, self.W2) + self.b2              # (N, 10)
-        a2 = self.softmax(z2)                            # (N, 10)
-        
-        # Compute loss (cross-entropy)
-        m = y_train_one_hot.shape[0]
-        loss = -np.sum(y_train_one_hot * np.log(a2 + 1e-8)) / m
-        self.train_losses.append(loss)
-        
-        # Compute accuracy
-        predictions = np.argmax(a2, axis=1)
-        accuracy = np.mean(predictions == y_train_shuffled)
-        self.train_accuracies.append(accuracy)
-        
-        # Backward pass
-        dz2 = (a2 - y_train_one_hot) / m                  # (N, 10)
-        dW2 = np.dot(a1.T, dz2)                           # (hidden_size, 10)
-        db2 = np.sum(dz2, axis=0, keepdims=True)          # (1, 10)
-        
-        da1 = np.dot(dz2, self.W2.T)                      # (N, hidden_size)
-        dz1 = da1 * self.relu_derivative(z1)              # (N, hidden_size)
-        dW1 = np.dot(X_train_shuffled.T, dz1)             # (input_size, hidden_size)
-        db1 = np.sum(dz1, axis=0, keepdims=True)          # (1, hidden_size)
-        
-        # Update weights and biases
-        self.W2 -= learning_rate * dW2
-        self.b2 -= learning_rate * db2
-        self.W1 -= learning_rate * dW1
-        self.b1 -= learning_rate * db1
-        
-        # Validation pass
-        z1_val = np.dot(self.X_val, self.W1) + self.b1
-        a1_val = self.relu(z1_val)
-        z2_val = np.dot(a1_val, self.W2) + self.b2
-        a2_val = self.softmax(z2_val)
-        
-        # Compute validation loss
-        y_val_one_hot = np.zeros((self.y_val.size, 10))
-        y_val_one_hot[np.arange(self.y_val.size), self.y_val] = 1
-        loss_val = -np.sum(y_val_one_hot * np.log(a2_val + 1e-8)) / self.y_val.size
-        self.val_losses.append(loss_val)
-        
-        # Compute validation accuracy
-        predictions_val = np.argmax(a2_val, axis=1)
-        accuracy_val = np.mean(predictions_val == self.y_val)
-        self.val_accuracies.append(accuracy_val)
-        
-        # Update plots
-        self.update_plots()
+        self.prediction_label.config(text=f"Predicted Digit: {top3[0]}   ({guesses})")
 
     def update_plots(self):
         # Update Loss Plot
         self.line_train_loss.set_data(range(1, len(self.train_losses)+1), self.train_losses)
         self.line_val_loss.set_data(range(1, len(self.val_losses)+1), self.val_losses)
-        self.ax_loss.set_xlim(0, max(10, len(self.train_losses)))
+        self.ax_loss.set_xlim(0, max(10, self.max_epochs, len(self.train_losses)))
         self.ax_loss.set_ylim(0, max(max(self.train_losses, default=1), max(self.val_losses, default=1)) + 0.5)
         
         # Update Accuracy Plot
         self.line_train_acc.set_data(range(1, len(self.train_accuracies)+1), self.train_accuracies)
         self.line_val_acc.set_data(range(1, len(self.val_accuracies)+1), self.val_accuracies)
-        self.ax_accuracy.set_xlim(0, max(10, len(self.train_accuracies)))
+        self.ax_accuracy.set_xlim(0, max(10, self.max_epochs, len(self.train_accuracies)))
         self.ax_accuracy.set_ylim(0, 1)
         
         # Redraw canvas
         self.canvas.draw()
 
+    def export_quantized_model(self):
+        if self.simulation_running:
+            return  # The weights are still changing
+        # Scales are calibrated on the validation split, which is also used for the comparison
+        bundle = quantize_model(self.params, self.X_val)
+        save_quantized(QUANTIZED_MODEL_PATH, bundle)
+        report = accuracy_report(self.params, bundle, self.X_val, self.y_val)
+        self.display_message(f"Int8 model exported. {format_report(report)}")
+
+    def training_checkpoint_path(self):
+        # Each combination of hyperparameters keeps its own checkpoint
+        return checkpoint_path(self.hidden_size.get(), self.lr.get(), self.batch_size.get(), self.optimizer_name.get(),
+                               self.conv_filters.get())
+
     def start_training(self):
         if self.simulation_running:
             return  # Prevent multiple trainings at once
@@ -327,29 +335,160 @@ class Quest7(Quest):
         self.train_accuracies = []
         self.val_accuracies = []
         self.init_network()  # Re-initialize network parameters
-        self.training_epoch = 0
-        self.max_epochs = self.epochs.get()
-        self.train_next_epoch()
-
-    def train_next_epoch(self):
-        if self.training_epoch < self.max_epochs and self.simulation_running:
-            self.train_epoch()
-            self.training_epoch += 1
-            self.ui.root.after(100, self.train_next_epoch)  # Adjust the delay as needed
-        else:
+        optimizer = OPTIMIZERS[self.optimizer_name.get()](self.lr.get())
+        self.run_training(optimizer)
+
+    def continue_training(self):
+        if self.simulation_running:
+            return  # Prevent multiple trainings at once
+        checkpoint = load_checkpoint(self.training_checkpoint_path())
+        if checkpoint is None:
+            self.display_message("No checkpoint for these settings yet. Starting from scratch.")
+            self.start_training()
+            return
+        self.simulation_running = True
+
+        # Resume from the weights, optimizer state and metrics of the last saved epoch
+        params, optimizer_state, history = checkpoint
+        self.params = params
+        optimizer = OPTIMIZERS[self.optimizer_name.get()](self.lr.get())
+        optimizer.load_state_dict(optimizer_state)
+        self.train_losses = list(history.get("train_loss", []))
+        self.val_losses = list(history.get("val_loss", []))
+        self.train_accuracies = list(history.get("train_accuracy", []))
+        self.val_accuracies = list(history.get("val_accuracy", []))
+        self.update_plots()
+        self.run_training(optimizer, history)
+
+    def run_training(self, optimizer, history=None):
+        self.engine = TrainingEngine(self.params, optimizer, batch_size=self.batch_size.get())
+        self.training_epoch = len(self.train_losses)
+        self.max_epochs = self.training_epoch + self.epochs.get()
+
+        # Train in a background thread; metrics come back through a queue polled on the Tk loop.
+        # The worker checkpoints after every epoch so the run can be continued later.
+        self.training_worker = TrainingWorker(self.engine, self.X_train, self.y_train, self.X_val, self.y_val,
+                                              self.max_epochs - self.training_epoch, history=history,
+                                              checkpoint_path=self.training_checkpoint_path(),
+                                              augment=self.augment.get())
+        self.training_worker.start()
+        self.poll_training(self.training_worker)
+
+    def drain_metrics(self, worker):
+        # Collect the epochs the worker finished since the last poll; None on the queue marks the end
+        epochs = []
+        while True:
+            try:
+                metrics = worker.metrics.get_nowait()
+            except queue.Empty:
+                return epochs, False
+            if metrics is None:
+                return epochs, True
+            epochs.append(metrics)
+
+    def poll_training(self, worker):
+        # A reset or a new run replaced this worker; stop polling it
+        if worker is not self.training_worker:
+            return
+
+        epochs, finished = self.drain_metrics(worker)
+        for metrics in epochs:
+            self.train_losses.append(metrics["train_loss"])
+            self.train_accuracies.append(metrics["train_accuracy"])
+            self.val_losses.append(metrics["val_loss"])
+            self.val_accuracies.append(metrics["val_accuracy"])
+            self.training_epoch = metrics["epoch"]
+
+        if epochs:
+            self.update_plots()
+
+        if finished:
+            self.training_worker = None
             self.simulation_running = False
             self.check_success()
+        else:
+            self.after(100, self.poll_training, worker)
 
-    def relu(self, z):
-        return np.maximum(0, z)
+    def start_comparison(self):
+        if self.simulation_running:
+            return  # Prevent multiple trainings at once
+        self.simulation_running = True
+        self.compare_history = []
+        self.update_comparison()
 
-    def relu_derivative(self, z):
-        return (z > 0).astype(float)
+        # All settings train as one stacked network: one weight set per setting along a leading model axis.
+        # Stacking covers the plain two-layer network; the conv layer is only used by single runs.
+        hidden_sizes = [hidden for _, hidden in self.compare_settings]
+        learning_rates = np.array([lr for lr, _ in self.compare_settings], dtype=np.float32).reshape(-1, 1, 1)
+        params = init_stacked_params(64, hidden_sizes, 10)
+        optimizer = OPTIMIZERS[self.optimizer_name.get()](learning_rates)
+        engine = TrainingEngine(params, optimizer, batch_size=self.batch_size.get())
+
+        self.training_worker = TrainingWorker(engine, self.X_train, self.y_train, self.X_val, self.y_val, self.epochs.get(),
+                                              augment=self.augment.get())
+        self.training_worker.start()
+        self.plot_tabs.select(self.compare_tab)
+        self.poll_comparison(self.training_worker)
+
+    def poll_comparison(self, worker):
+        # A reset or a new run replaced this worker; stop polling it
+        if worker is not self.training_worker:
+            return
+
+        epochs, finished = self.drain_metrics(worker)
+        self.compare_history.extend(epochs)
+        if epochs:
+            self.update_comparison()
+
+        if finished:
+            self.training_worker = None
+            self.simulation_running = False
+            if self.compare_history:
+                # Move the sliders to the winning setting so Start Training uses it
+                best = int(np.argmax(self.compare_history[-1]["val_accuracy"]))
+                lr, hidden = self.compare_settings[best]
+                self.lr.set(lr)
+                self.hidden_size.set(hidden)
+                self.conv_filters.set(0)  # Compared networks have no conv layer
+                # Keep the winning network, so it can be tested on the drawing pad or exported right away
+                self.params = unstack_params(worker.engine.params, best, hidden)
+                # and checkpoint it under its own settings, so Continue Training picks up where the comparison ended
+                optimizer = OPTIMIZERS[self.optimizer_name.get()](lr)
+                optimizer.load_state_dict(unstack_optimizer_state(worker.engine.optimizer.state_dict(), best, hidden))
+                history = {name: [float(values[best]) for values in values_per_epoch]
+                           for name, values_per_epoch in worker.history.items()}
+                save_checkpoint(self.training_checkpoint_path(), self.params, optimizer, history)
+                accuracy = self.compare_history[-1]["val_accuracy"][best] * 100
+                self.display_message(f"Best setting: learning rate {lr}, {hidden} hidden neurons ({accuracy:.2f}%).")
+        else:
+            self.after(100, self.poll_comparison, worker)
+
+    def update_comparison(self):
+        # Curves: one row per epoch, one column per setting
+        if self.compare_history:
+            val_losses = np.array([metrics["val_loss"] for metrics in self.compare_history])
+            val_accuracies = np.array([metrics["val_accuracy"] for metrics in self.compare_history])
+        else:
+            val_losses = val_accuracies = np.empty((0, len(self.compare_settings)))
+        epochs = np.arange(1, len(val_losses) + 1)
+        for k, (loss_line, acc_line) in enumerate(zip(self.compare_loss_lines, self.compare_acc_lines)):
+            loss_line.set_data(epochs, val_losses[:, k])
+            acc_line.set_data(epochs, val_accuracies[:, k])
+        self.ax_compare_loss.set_xlim(0, max(10, len(epochs)))
+        self.ax_compare_loss.set_ylim(0, max(1.0, val_losses.max(initial=0)) + 0.5)
+        self.ax_compare_acc.set_xlim(0, max(10, len(epochs)))
+        self.ax_compare_acc.set_ylim(0, 1)
+        self.compare_canvas.draw()
+
+        # Leaderboard sorted by the latest validation accuracy
+        self.leaderboard.delete(*self.leaderboard.get_children())
+        if len(val_accuracies):
+            ranking = np.argsort(-val_accuracies[-1], kind="stable")
+            for rank, k in enumerate(ranking, start=1):
+                lr, hidden = self.compare_settings[k]
+                self.leaderboard.insert("", tk.END, values=(rank, lr, hidden, f"{val_accuracies[-1, k]:.1%}",
+                                                            f"{val_losses[-1, k]:.3f}"))
 
-    def softmax(self, z):
-        exp_z = np.exp(z - np.max(z, axis=1, keepdims=True))
-        return exp_z / np.sum(exp_z, axis=1, keepdims=True)
-    
     def check_success(self):
         # Check the latest validation accuracy
         if len(self.val_accuracies) == 0:
@@ -360,10 +499,14 @@ class Quest7(Quest):
         
         # Define success threshold
         success_threshold = 90.0  # 90%
+        self.publish(SimulationFinished, success=latest_val_accuracy >= success_threshold, parameters={
+            "lr": self.lr.get(), "hidden_size": self.hidden_size.get(), "batch_size": self.batch_size.get(),
+            "epochs": self.training_epoch, "optimizer": self.optimizer_name.get(), "conv_filters": self.conv_filters.get(),
+            "val_accuracy": latest_val_accuracy})
         
         if latest_val_accuracy >= success_threshold:
             self.display_message(f"Success! Validation Accuracy: {latest_val_accuracy:.2f}%", success=True)
-            self.ui.root.after(2000, self.end_quest)
+            self.after(2000, self.end_quest)
         else:
             self.display_message(f"Validation Accuracy: {latest_val_accuracy:.2f}%. Try adjusting hyperparameters.", error=True)
 
@@ -385,6 +528,14 @@ class Quest7(Quest):
         self.message_label.configure(foreground=color)
         self.message_label.pack(pady=5)
 
+    def stop(self):
+        # Leaving the quest also stops a running training or comparison
+        if self.training_worker:
+            self.training_worker.cancel()
+            self.training_worker = None
+        self.simulation_running = False
+        super().stop()
+
     def skip_quest(self):
         self.ui.game_engine.skip_current_quest()
 
@@ -0,0 +1,100 @@
+# quests/quest7_augment.py
+
+import queue
+import threading
+
+import numpy as np
+
+IMAGE_SIZE = 8
+
+
+def augment_batch(X, rng, max_shift=1.0, scale_range=(0.85, 1.15), thicken_probability=0.3, thicken_strength=0.6):
+    """
+    Randomly shifted, scaled and thickened copies of a batch of flattened 8x8 digits.
+    Every image gets its own transform, but the work is done with whole-batch array operations.
+    """
+    batch_size = X.shape[0]
+    images = np.asarray(X, dtype=np.float32).reshape(batch_size, IMAGE_SIZE, IMAGE_SIZE)
+
+    # Inverse mapping: for every output pixel, the source position in the original image
+    scale = rng.uniform(*scale_range, size=(batch_size, 1, 1))
+    shift_y = rng.uniform(-max_shift, max_shift, size=(batch_size, 1, 1))
+    shift_x = rng.uniform(-max_shift, max_shift, size=(batch_size, 1, 1))
+    center = (IMAGE_SIZE - 1) / 2
+    grid = np.arange(IMAGE_SIZE)
+    # One pixel of zero padding on each side, so sources just outside the image blend with background
+    src_y = np.clip((grid[None, :, None] - center - shift_y) / scale + center, -1, IMAGE_SIZE) + 1  # (B, 8, 1)
+    src_x = np.clip((grid[None, None, :] - center - shift_x) / scale + center, -1, IMAGE_SIZE) + 1  # (B, 1, 8)
+    padded = np.pad(images, ((0, 0), (1, 1), (1, 1)))
+
+    # Bilinear interpolation between the four neighbouring source pixels
+    y0 = np.minimum(np.floor(src_y).astype(np.intp), IMAGE_SIZE)
+    x0 = np.minimum(np.floor(src_x).astype(np.intp), IMAGE_SIZE)
+    wy = (src_y - y0).astype(np.float32)
+    wx = (src_x - x0).astype(np.float32)
+    rows = np.arange(batch_size)[:, None, None]
+    top = padded[rows, y0, x0] * (1 - wx) + padded[rows, y0, x0 + 1] * wx
+    bottom = padded[rows, y0 + 1, x0] * (1 - wx) + padded[rows, y0 + 1, x0 + 1] * wx
+    out = top * (1 - wy) + bottom * wy
+
+    # Thicken strokes of some images: each pixel takes a share of its brightest 4-neighbour
+    thicken = rng.random(batch_size) < thicken_probability
+    if thicken.any():
+        selected = np.pad(out[thicken], ((0, 0), (1, 1), (1, 1)))
+        neighbours = np.maximum.reduce([selected[:, :-2, 1:-1], selected[:, 2:, 1:-1],
+                                        selected[:, 1:-1, :-2], selected[:, 1:-1, 2:]])
+        out[thicken] = np.maximum(out[thicken], thicken_strength * neighbours)
+
+    return out.reshape(batch_size, -1)
+
+
+def augmented_batches(X, Y, y, batch_size, rng=None, **augment_options):
+    """
+    Yields one epoch of shuffled (X_batch, Y_batch, labels) mini-batches with freshly augmented images.
+    Y holds the one-hot targets for y; augment_options are passed to augment_batch.
+    """
+    rng = rng if rng is not None else np.random.default_rng()
+    order = rng.permutation(X.shape[0])
+    for start in range(0, order.size, batch_size):
+        batch = order[start:start + batch_size]
+        yield augment_batch(X[batch], rng, **augment_options), Y[batch], np.asarray(y[batch], dtype=np.intp)
+
+
+def prefetch(iterable, depth=2):
+    """
+    Iterates over iterable in a background thread, keeping up to depth items ready.
+    Closing the returned generator early stops the thread.
+    """
+    items = queue.Queue(maxsize=depth)
+    stop = threading.Event()
+
+    def put(item):
+        # Gives up once the consumer has gone away
+        while not stop.is_set():
+            try:
+                items.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def produce():
+        try:
+            for item in iterable:
+                if not put((True, item)):
+                    return
+            put((False, None))
+        except Exception as error:
+            put((False, error))
+
+    threading.Thread(target=produce, daemon=True).start()
+    try:
+        while True:
+            has_item, item = items.get()
+            if not has_item:
+                if item is not None:
+                    raise item
+                return
+            yield item
+    finally:
+        stop.set()
@@ -0,0 +1,71 @@
+# quests/quest7_canvas.py
+
+import numpy as np
+
+CANVAS_SIZE = 200  # Drawing pad size in pixels
+IMAGE_SIZE = 8     # The digits dataset uses 8x8 images
+BRUSH_RADIUS = 4
+
+
+class DigitRaster:
+    def __init__(self, size=CANVAS_SIZE, image_size=IMAGE_SIZE, brush_radius=BRUSH_RADIUS):
+        """
+        Ink coverage of the drawing pad, kept as a NumPy array alongside the Tk canvas items.
+        Pixels are 1.0 where ink was drawn and 0.0 elsewhere.
+        """
+        if size % image_size:
+            raise ValueError("size must be a multiple of image_size")
+        self.size = size
+        self.image_size = image_size
+        self.block = size // image_size
+        self.pixels = np.zeros((size, size), dtype=np.float32)
+        # Disk stamped at every brush position
+        offsets = np.arange(-brush_radius, brush_radius + 1)
+        self.brush = (offsets[:, None] ** 2 + offsets[None, :] ** 2 <= brush_radius ** 2).astype(np.float32)
+        self.brush_radius = brush_radius
+        self._image = np.empty((image_size, image_size), dtype=np.float32)
+        self._features = np.empty((1, image_size * image_size), dtype=np.float32)
+
+    def clear(self):
+        self.pixels.fill(0.0)
+
+    def stamp(self, x, y):
+        """
+        Marks the brush disk centred on canvas pixel (x, y), clipped to the pad.
+        """
+        r = self.brush_radius
+        top, left = y - r, x - r
+        y0, x0 = max(top, 0), max(left, 0)
+        y1, x1 = min(top + 2 * r + 1, self.size), min(left + 2 * r + 1, self.size)
+        if y0 >= y1 or x0 >= x1:
+            return
+        target = self.pixels[y0:y1, x0:x1]
+        np.maximum(target, self.brush[y0 - top:y1 - top, x0 - left:x1 - left], out=target)
+
+    def stroke(self, x0, y0, x1, y1):
+        """
+        Marks the brush along the segment from (x0, y0) to (x1, y1), one pixel apart so fast strokes leave no gaps.
+        """
+        steps = max(int(np.ceil(np.hypot(x1 - x0, y1 - y0))), 1)
+        for t in np.linspace(0.0, 1.0, steps + 1)[1:]:
+            self.stamp(int(round(x0 + (x1 - x0) * t)), int(round(y0 + (y1 - y0) * t)))
+
+    def image(self):
+        """
+        Block-averaged image_size x image_size version of the pad, values in [0, 1].
+        The returned array is reused by the next call.
+        """
+        blocks = self.pixels.reshape(self.image_size, self.block, self.image_size, self.block)
+        np.mean(blocks, axis=(1, 3), out=self._image)
+        return self._image
+
+    def features(self):
+        """
+        The pad as a (1, 64) network input, quantized to the dataset's 17 grey levels.
+        The returned array is reused by the next call.
+        """
+        features = self._features.reshape(self.image_size, self.image_size)  # View of the feature buffer
+        np.multiply(self.image(), 16.0, out=features)
+        np.round(features, out=features)
+        np.divide(features, 16.0, out=features)
+        return self._features
@@ -0,0 +1,45 @@
+# quests/quest7_checkpoints.py
+
+import os
+
+import numpy as np
+
+CHECKPOINT_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".cache", "quest7-checkpoints")
+
+
+def checkpoint_path(hidden_size, lr, batch_size, optimizer_name, conv_filters=0, checkpoint_dir=CHECKPOINT_DIR):
+    """
+    Checkpoint file for a set of hyperparameters; every setting keeps its own latest run.
+    """
+    conv = f"-conv{conv_filters}" if conv_filters else ""
+    return os.path.join(checkpoint_dir, f"hidden{hidden_size}{conv}-lr{lr:.4f}-batch{batch_size}-{optimizer_name}.npz")
+
+
+def save_checkpoint(path, params, optimizer, history):
+    """
+    Writes the weights, optimizer state and metric history to a compressed .npz file.
+    """
+    arrays = {f"param.{name}": value for name, value in params.items()}
+    arrays.update({f"optimizer.{key}": value for key, value in optimizer.state_dict().items()})
+    arrays.update({f"history.{name}": np.asarray(values, dtype=np.float64) for name, values in history.items()})
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # Write to a temporary file first so a crash mid-save keeps the previous checkpoint
+    tmp_path = f"{path[:-len('.npz')]}.tmp.npz"
+    np.savez_compressed(tmp_path, **arrays)
+    os.replace(tmp_path, path)
+
+
+def load_checkpoint(path):
+    """
+    Returns (params, optimizer_state, history) from a checkpoint, or None if there is none.
+    """
+    if not os.path.exists(path):
+        return None
+    with np.load(path) as archive:
+        sections = {"param": {}, "optimizer": {}, "history": {}}
+        for key in archive.files:
+            section, name = key.split(".", 1)
+            sections[section][name] = archive[key]
+    history = {name: values.tolist() for name, values in sections["history"].items()}
+    return sections["param"], sections["optimizer"], history
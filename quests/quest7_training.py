@@ -0,0 +1,558 @@
+# quests/quest7_training.py
+
+import queue
+import threading
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from quests.quest7_augment import augmented_batches, prefetch
+from quests.quest7_checkpoints import save_checkpoint
+
+
+def relu(z):
+    return np.maximum(0, z)
+
+
+def softmax(z):
+    exp_z = np.exp(z - np.max(z, axis=1, keepdims=True))
+    return exp_z / np.sum(exp_z, axis=1, keepdims=True)
+
+
+def one_hot(y, num_classes=10, dtype=np.float32):
+    """
+    Encodes integer labels as one-hot rows.
+    """
+    encoded = np.zeros((y.size, num_classes), dtype=dtype)
+    encoded[np.arange(y.size), y] = 1
+    return encoded
+
+
+CONV_KERNEL = 3  # Convolution filters are 3x3 with zero "same" padding
+
+
+def init_params(input_size, hidden_size, output_size, dtype=np.float32, conv_filters=0):
+    """
+    Small random weights and zero biases for the two-layer network.
+    With conv_filters > 0 a convolution layer (Wc, bc) runs first on the square input image,
+    and the hidden layer sees its conv_filters feature maps instead of the raw pixels.
+    """
+    params = {}
+    if conv_filters:
+        fan_in = CONV_KERNEL * CONV_KERNEL
+        params["Wc"] = (np.random.randn(fan_in, conv_filters) * np.sqrt(2.0 / fan_in)).astype(dtype)
+        params["bc"] = np.zeros((1, conv_filters), dtype=dtype)
+        input_size *= conv_filters
+    params.update({
+        "W1": (np.random.randn(input_size, hidden_size) * 0.01).astype(dtype),
+        "b1": np.zeros((1, hidden_size), dtype=dtype),
+        "W2": (np.random.randn(hidden_size, output_size) * 0.01).astype(dtype),
+        "b2": np.zeros((1, output_size), dtype=dtype),
+    })
+    return params
+
+
+def image_side(pixels):
+    side = int(round(np.sqrt(pixels)))
+    if side * side != pixels:
+        raise ValueError("The convolution layer needs square input images")
+    return side
+
+
+def conv_features(params, X):
+    """
+    Convolution layer output (after ReLU) for flattened square images, shape (N, pixels * filters).
+    """
+    n, side = X.shape[0], image_side(X.shape[1])
+    pad = CONV_KERNEL // 2
+    padded = np.pad(X.reshape(n, side, side), ((0, 0), (pad, pad), (pad, pad)))
+    # im2col: one row of kernel-sized patch values per output pixel
+    cols = sliding_window_view(padded, (CONV_KERNEL, CONV_KERNEL), axis=(1, 2)).reshape(n * side * side, -1)
+    return relu(cols @ params["Wc"] + params["bc"]).reshape(n, -1)
+
+
+def forward(params, X):
+    """
+    Forward pass; returns the hidden pre-activation, hidden activation and class probabilities.
+    Allocates its results, so it is meant for one-off predictions; training uses forward_into.
+    """
+    if "Wc" in params:
+        X = conv_features(params, X)
+    z1 = np.dot(X, params["W1"]) + params["b1"]  # (N, hidden_size)
+    a1 = relu(z1)                                # (N, hidden_size)
+    z2 = np.dot(a1, params["W2"]) + params["b2"]  # (N, 10)
+    return z1, a1, softmax(z2)
+
+
+def predict_proba(params, X):
+    return forward(params, X)[2]
+
+
+def init_stacked_params(input_size, hidden_sizes, output_size, dtype=np.float32):
+    """
+    Parameters of len(hidden_sizes) networks stacked along a leading model axis.
+    Hidden layers are zero-padded to the largest size. Padded units have no weights and a zero ReLU gradient,
+    so they stay at zero during training and each model behaves like its unpadded network.
+    """
+    width = max(hidden_sizes)
+    params = {
+        "W1": np.zeros((len(hidden_sizes), input_size, width), dtype=dtype),
+        "b1": np.zeros((len(hidden_sizes), 1, width), dtype=dtype),
+        "W2": np.zeros((len(hidden_sizes), width, output_size), dtype=dtype),
+        "b2": np.zeros((len(hidden_sizes), 1, output_size), dtype=dtype),
+    }
+    for k, hidden_size in enumerate(hidden_sizes):
+        single = init_params(input_size, hidden_size, output_size, dtype)
+        params["W1"][k, :, :hidden_size] = single["W1"]
+        params["W2"][k, :hidden_size, :] = single["W2"]
+    return params
+
+
+def unstack_params(params, k, hidden_size):
+    """
+    Model k of a stacked parameter set, without its padding.
+    """
+    return {
+        "W1": params["W1"][k, :, :hidden_size].copy(),
+        "b1": params["b1"][k, :, :hidden_size].copy(),
+        "W2": params["W2"][k, :hidden_size, :].copy(),
+        "b2": params["b2"][k].copy(),
+    }
+
+
+def unstack_optimizer_state(state, k, hidden_size):
+    """
+    Optimizer state_dict() of model k of a stacked parameter set: per-parameter entries ("m.W1", "velocity.b2", ...)
+    are unstacked like unstack_params, anything else (e.g. Adam's step count) is shared and kept as is.
+    """
+    groups, unstacked = {}, {}
+    for key, value in state.items():
+        if "." in key:
+            group, name = key.split(".", 1)
+            groups.setdefault(group, {})[name] = value
+        else:
+            unstacked[key] = value
+    for group, values in groups.items():
+        unstacked.update({f"{group}.{name}": value for name, value in unstack_params(values, k, hidden_size).items()})
+    return unstacked
+
+
+class Workspace:
+    def __init__(self, rows, input_size, hidden_size, output_size, dtype=np.float32, models=(), conv_filters=0):
+        """
+        Preallocated arrays for the forward and backward passes over up to `rows` samples.
+        Smaller batches use leading slices along the sample axis.
+        models is the leading shape of stacked parameters, e.g. (K,) when K networks train side by side.
+        conv_filters adds the buffers of the optional convolution layer (single networks only).
+        """
+        models = tuple(models)
+        self.conv_filters = conv_filters
+        if conv_filters:
+            side = image_side(input_size)
+            pad = CONV_KERNEL // 2
+            # The border of the padded images is never written, so it stays zero
+            self.padded = np.zeros((rows, side + 2 * pad, side + 2 * pad), dtype)
+            # Zero-copy view of every kernel-sized patch; it follows whatever is written into padded
+            self.patches = sliding_window_view(self.padded, (CONV_KERNEL, CONV_KERNEL), axis=(1, 2))
+            self.cols = np.empty((rows, input_size, CONV_KERNEL * CONV_KERNEL), dtype)
+            self.conv_z = np.empty((rows, input_size * conv_filters), dtype)
+            self.conv_mask = np.empty((rows, input_size * conv_filters), bool)
+            self.features = np.empty((rows, input_size * conv_filters), dtype)
+            self.dfeatures = np.empty((rows, input_size * conv_filters), dtype)
+            first_layer_inputs = input_size * conv_filters
+        else:
+            first_layer_inputs = input_size
+        self.X = np.empty((rows, input_size), dtype)
+        self.Y = np.empty((rows, output_size), dtype)
+        self.labels = np.empty(rows, np.intp)
+        self.z1 = np.empty(models + (rows, hidden_size), dtype)
+        self.a1 = np.empty(models + (rows, hidden_size), dtype)
+        self.mask = np.empty(models + (rows, hidden_size), bool)
+        self.probs = np.empty(models + (rows, output_size), dtype)
+        self.log_probs = np.empty(models + (rows, output_size), dtype)
+        self.row = np.empty(models + (rows, 1), dtype)
+        self.dz2 = np.empty(models + (rows, output_size), dtype)
+        self.da1 = np.empty(models + (rows, hidden_size), dtype)
+        self.predictions = np.empty(models + (rows,), np.intp)
+        self.hits = np.empty(models + (rows,), bool)
+        self.grads = {
+            "W1": np.empty(models + (first_layer_inputs, hidden_size), dtype),
+            "b1": np.empty(models + (1, hidden_size), dtype),
+            "W2": np.empty(models + (hidden_size, output_size), dtype),
+            "b2": np.empty(models + (1, output_size), dtype),
+        }
+        if conv_filters:
+            self.grads["Wc"] = np.empty((CONV_KERNEL * CONV_KERNEL, conv_filters), dtype)
+            self.grads["bc"] = np.empty((1, conv_filters), dtype)
+
+
+def conv_forward_into(params, X, ws):
+    """
+    Convolution layer as im2col plus one matmul, written into the workspace. Returns the features view.
+    """
+    n = X.shape[0]
+    side = ws.padded.shape[1] - 2 * (CONV_KERNEL // 2)
+    filters = ws.conv_filters
+    pad = CONV_KERNEL // 2
+    ws.padded[:n, pad:pad + side, pad:pad + side] = X.reshape(n, side, side)
+    cols = ws.cols[:n]
+    np.copyto(cols.reshape(n, side, side, CONV_KERNEL, CONV_KERNEL), ws.patches[:n])
+    conv_z = ws.conv_z[:n]
+    np.matmul(cols.reshape(n * side * side, -1), params["Wc"], out=conv_z.reshape(n * side * side, filters))
+    conv_z.reshape(n * side * side, filters)[...] += params["bc"]
+    features = ws.features[:n]
+    np.maximum(conv_z, 0, out=features)
+    return features
+
+
+def conv_backward_into(params, da1, ws):
+    """
+    Gradients of the convolution layer, given the hidden layer's gradient after forward_into on the same batch.
+    """
+    n = da1.shape[0]
+    filters = ws.conv_filters
+    dfeatures, conv_mask = ws.dfeatures[:n], ws.conv_mask[:n]
+    np.matmul(da1, params["W1"].T, out=dfeatures)
+    np.greater(ws.conv_z[:n], 0, out=conv_mask)                     # ReLU derivative
+    np.multiply(dfeatures, conv_mask, out=dfeatures)
+    dconv = dfeatures.reshape(-1, filters)                          # (N * pixels, filters)
+    cols = ws.cols[:n].reshape(dconv.shape[0], -1)                  # (N * pixels, kernel area)
+    np.matmul(cols.T, dconv, out=ws.grads["Wc"])
+    np.sum(dconv, axis=0, keepdims=True, out=ws.grads["bc"])
+
+
+# The pass functions below use matmul and index the sample axis from the end ([..., :n, :]),
+# so the same code trains a single network and a stack of networks.
+
+def forward_into(params, X, ws):
+    """
+    Forward pass for the len(X) samples in X, written into the workspace. Returns the probabilities view.
+    """
+    n = X.shape[0]
+    z1, a1, probs, row = ws.z1[..., :n, :], ws.a1[..., :n, :], ws.probs[..., :n, :], ws.row[..., :n, :]
+    if ws.conv_filters:
+        X = conv_forward_into(params, X, ws)
+    np.matmul(X, params["W1"], out=z1)
+    z1 += params["b1"]
+    np.maximum(z1, 0, out=a1)
+    np.matmul(a1, params["W2"], out=probs)
+    probs += params["b2"]
+    # Softmax in place
+    np.max(probs, axis=-1, keepdims=True, out=row)
+    probs -= row
+    np.exp(probs, out=probs)
+    np.sum(probs, axis=-1, keepdims=True, out=row)
+    probs /= row
+    return probs
+
+
+def score_into(ws, probs, Y, labels):
+    """
+    Summed cross-entropy and number of correct predictions for a batch, using workspace buffers.
+    For stacked parameters both are arrays with one entry per model.
+    """
+    n = probs.shape[-2]
+    log_probs = ws.log_probs[..., :n, :]
+    np.add(probs, 1e-8, out=log_probs)
+    np.log(log_probs, out=log_probs)
+    log_probs *= Y
+    predictions, hits = ws.predictions[..., :n], ws.hits[..., :n]
+    np.argmax(probs, axis=-1, out=predictions)
+    np.equal(predictions, labels, out=hits)
+    return -log_probs.sum(axis=(-2, -1), dtype=np.float64), np.count_nonzero(hits, axis=-1)
+
+
+def backward_into(params, X, Y, ws):
+    """
+    Backward pass after forward_into on the same batch; fills and returns ws.grads.
+    """
+    n = X.shape[0]
+    grads = ws.grads
+    dz2, da1, mask = ws.dz2[..., :n, :], ws.da1[..., :n, :], ws.mask[..., :n, :]
+
+    np.subtract(ws.probs[..., :n, :], Y, out=dz2)                           # (N, 10)
+    dz2 *= 1.0 / n
+    np.matmul(ws.a1[..., :n, :].swapaxes(-1, -2), dz2, out=grads["W2"])      # (hidden_size, 10)
+    np.sum(dz2, axis=-2, keepdims=True, out=grads["b2"])                     # (1, 10)
+
+    np.matmul(dz2, params["W2"].swapaxes(-1, -2), out=da1)                   # (N, hidden_size)
+    np.greater(ws.z1[..., :n, :], 0, out=mask)                               # ReLU derivative
+    np.multiply(da1, mask, out=da1)
+    inputs = ws.features[:n] if ws.conv_filters else X
+    np.matmul(inputs.T, da1, out=grads["W1"])                                # (input_size, hidden_size)
+    np.sum(da1, axis=-2, keepdims=True, out=grads["b1"])                     # (1, hidden_size)
+    if ws.conv_filters:
+        conv_backward_into(params, da1, ws)
+    return grads
+
+
+class SGD:
+    def __init__(self, lr):
+        """
+        Plain gradient descent.
+        Like the other optimizers, step() updates params in place and may overwrite grads.
+        For stacked parameters lr may be an array of shape (K, 1, 1) with one learning rate per model.
+        """
+        self.lr = lr
+
+    def step(self, params, grads):
+        for name, grad in grads.items():
+            grad *= self.lr
+            params[name] -= grad
+
+    def state_dict(self):
+        """
+        Optimizer state as a flat dictionary of arrays, for checkpoints.
+        """
+        return {}
+
+    def load_state_dict(self, state):
+        pass
+
+
+class Momentum:
+    def __init__(self, lr, beta=0.9):
+        """
+        Gradient descent with heavy-ball momentum.
+        """
+        self.lr = lr
+        self.beta = beta
+        self.velocity = {}
+
+    def step(self, params, grads):
+        for name, grad in grads.items():
+            if name not in self.velocity:
+                self.velocity[name] = np.zeros_like(grad)
+            velocity = self.velocity[name]
+            velocity *= self.beta
+            velocity += grad
+            np.multiply(velocity, self.lr, out=grad)
+            params[name] -= grad
+
+    def state_dict(self):
+        return {f"velocity.{name}": value for name, value in self.velocity.items()}
+
+    def load_state_dict(self, state):
+        self.velocity = {key.split(".", 1)[1]: value.copy() for key, value in state.items() if key.startswith("velocity.")}
+
+
+class Adam:
+    def __init__(self, lr, beta1=0.9, beta2=0.999, eps=1e-8):
+        """
+        Adam with bias-corrected first and second moment estimates.
+        """
+        self.lr = lr
+        self.beta1 = beta1
+        self.beta2 = beta2
+        self.eps = eps
+        self.t = 0
+        self.m = {}
+        self.v = {}
+        self.scratch = {}
+
+    def step(self, params, grads):
+        self.t += 1
+        correction1 = 1 - self.beta1 ** self.t
+        correction2 = 1 - self.beta2 ** self.t
+        for name, grad in grads.items():
+            # Moments and scratch are created once; a loaded checkpoint brings m and v but no scratch
+            if name not in self.m:
+                self.m[name] = np.zeros_like(grad)
+                self.v[name] = np.zeros_like(grad)
+            if name not in self.scratch:
+                self.scratch[name] = np.empty_like(grad)
+            m, v, tmp = self.m[name], self.v[name], self.scratch[name]
+            m *= self.beta1
+            np.multiply(grad, 1 - self.beta1, out=tmp)
+            m += tmp
+            v *= self.beta2
+            np.square(grad, out=tmp)
+            tmp *= 1 - self.beta2
+            v += tmp
+            # Step: lr * m_hat / (sqrt(v_hat) + eps)
+            np.divide(v, correction2, out=tmp)
+            np.sqrt(tmp, out=tmp)
+            tmp += self.eps
+            np.divide(m, tmp, out=tmp)
+            tmp *= self.lr / correction1
+            params[name] -= tmp
+
+    def state_dict(self):
+        state = {"t": np.array(self.t)}
+        state.update({f"m.{name}": value for name, value in self.m.items()})
+        state.update({f"v.{name}": value for name, value in self.v.items()})
+        return state
+
+    def load_state_dict(self, state):
+        self.t = int(state.get("t", 0))
+        self.m = {key.split(".", 1)[1]: value.copy() for key, value in state.items() if key.startswith("m.")}
+        self.v = {key.split(".", 1)[1]: value.copy() for key, value in state.items() if key.startswith("v.")}
+
+
+OPTIMIZERS = {"SGD": SGD, "Momentum": Momentum, "Adam": Adam}
+
+
+class TrainingEngine:
+    def __init__(self, params, optimizer, batch_size=32, dtype=np.float32):
+        """
+        Mini-batch trainer for the two-layer digit network.
+        params is updated in place, so callers holding the dictionary see the new weights.
+        Work buffers are allocated on first use and reused, so an epoch does not allocate arrays.
+        With stacked parameters (init_stacked_params) all models train on the same batches
+        and losses and accuracies are returned per model.
+        """
+        self.params = params
+        self.optimizer = optimizer
+        self.batch_size = batch_size
+        self.dtype = dtype
+        self._workspaces = {}
+        self._order = None
+
+    def workspace(self, rows):
+        if rows not in self._workspaces:
+            *models, input_size, hidden_size = self.params["W1"].shape
+            output_size = self.params["W2"].shape[-1]
+            conv_filters = self.params["Wc"].shape[1] if "Wc" in self.params else 0
+            if conv_filters:
+                input_size //= conv_filters  # W1 sees one value per pixel and filter
+            self._workspaces[rows] = Workspace(rows, input_size, hidden_size, output_size, self.dtype, models,
+                                               conv_filters)
+        return self._workspaces[rows]
+
+    def prepare(self, X, y):
+        """
+        Converts inputs to the engine's dtype and builds the one-hot targets.
+        Call once per dataset and pass the results to train_epoch/evaluate.
+        """
+        return np.asarray(X, dtype=self.dtype), one_hot(np.asarray(y), dtype=self.dtype)
+
+    def train_batch(self, X, Y, labels, ws):
+        """
+        One optimizer step on a batch (which may live in the workspace). Returns (summed loss, correct).
+        """
+        probs = forward_into(self.params, X, ws)
+        loss, correct = score_into(ws, probs, Y, labels)
+        self.optimizer.step(self.params, backward_into(self.params, X, Y, ws))
+        return loss, correct
+
+    def train_epoch(self, X, y, Y=None, should_stop=None):
+        """
+        One pass over shuffled mini-batches with an optimizer step per batch.
+        Y is the one-hot form of y (see prepare); it is built here if not given.
+        should_stop is checked before every batch; when it returns True the epoch ends early.
+        Returns the epoch's mean training loss and accuracy over the batches that ran.
+        """
+        if Y is None:
+            X, Y = self.prepare(X, y)
+        return self.train_stream(self._shuffled_batches(X, Y, y), should_stop)
+
+    def _shuffled_batches(self, X, Y, y):
+        # Gathers each mini-batch into the workspace instead of allocating new arrays
+        n = X.shape[0]
+        if self._order is None or self._order.size != n:
+            self._order = np.arange(n)
+        np.random.shuffle(self._order)
+        ws = self.workspace(self.batch_size)
+        for start in range(0, n, self.batch_size):
+            batch = self._order[start:start + self.batch_size]
+            rows = batch.size
+            X_batch, Y_batch, labels = ws.X[:rows], ws.Y[:rows], ws.labels[:rows]
+            np.take(X, batch, axis=0, out=X_batch)
+            np.take(Y, batch, axis=0, out=Y_batch)
+            np.take(y, batch, out=labels)
+            yield X_batch, Y_batch, labels
+
+    def train_stream(self, batches, should_stop=None):
+        """
+        Trains on (X_batch, Y_batch, labels) mini-batches from any iterable, e.g. an augmentation pipeline.
+        Batches must be in the engine's dtype and hold at most batch_size rows.
+        Returns the mean training loss and accuracy over the batches that ran.
+        """
+        ws = self.workspace(self.batch_size)
+        total_loss = 0.0
+        correct = 0
+        seen = 0
+        for X_batch, Y_batch, labels in batches:
+            if should_stop is not None and should_stop():
+                break
+            batch_loss, batch_correct = self.train_batch(X_batch, Y_batch, labels, ws)
+            total_loss += batch_loss
+            correct += batch_correct
+            seen += labels.shape[0]
+        return total_loss / max(seen, 1), correct / max(seen, 1)
+
+    def evaluate(self, X, y, Y=None):
+        """
+        Loss and accuracy on a held-out set.
+        """
+        if Y is None:
+            X, Y = self.prepare(X, y)
+        ws = self.workspace(X.shape[0])
+        probs = forward_into(self.params, X, ws)
+        loss, correct = score_into(ws, probs, Y, y)
+        return loss / y.size, correct / y.size
+
+
+class TrainingWorker(threading.Thread):
+    def __init__(self, engine, X_train, y_train, X_val, y_val, epochs, history=None, checkpoint_path=None,
+                 augment=False):
+        """
+        Runs the training loop off the Tk thread.
+        After every epoch a metrics dictionary is put on the metrics queue; None marks the end of training.
+        history holds the metrics of earlier epochs when continuing a run; epoch numbers carry on from it.
+        If checkpoint_path is given, a checkpoint is written there after every epoch.
+        With augment, every epoch trains on freshly shifted, scaled and thickened digits prepared by a prefetch thread.
+        """
+        super().__init__(daemon=True)
+        self.engine = engine
+        self.history = {name: list(values) for name, values in (history or {}).items()}
+        self.checkpoint_path = checkpoint_path
+        self.augment = augment
+        self.y_train, self.y_val = y_train, y_val
+        # Float conversion and one-hot targets are done once, not every epoch
+        self.X_train, self.Y_train = engine.prepare(X_train, y_train)
+        self.X_val, self.Y_val = engine.prepare(X_val, y_val)
+        self.epochs = epochs
+        self.metrics = queue.Queue()
+        self._cancel = threading.Event()
+
+    def cancel(self):
+        """
+        Asks the worker to stop; it finishes the current batch and exits.
+        """
+        self._cancel.set()
+
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    def train_epoch(self):
+        if not self.augment:
+            return self.engine.train_epoch(self.X_train, self.y_train, self.Y_train, should_stop=self._cancel.is_set)
+        batches = prefetch(augmented_batches(self.X_train, self.Y_train, self.y_train, self.engine.batch_size))
+        try:
+            return self.engine.train_stream(batches, should_stop=self._cancel.is_set)
+        finally:
+            batches.close()
+
+    def run(self):
+        first_epoch = len(self.history.get("train_loss", [])) + 1
+        try:
+            for epoch in range(first_epoch, first_epoch + self.epochs):
+                train_loss, train_accuracy = self.train_epoch()
+                if self.cancelled:
+                    break
+                val_loss, val_accuracy = self.engine.evaluate(self.X_val, self.y_val, self.Y_val)
+                metrics = {
+                    "train_loss": train_loss,
+                    "train_accuracy": train_accuracy,
+                    "val_loss": val_loss,
+                    "val_accuracy": val_accuracy,
+                }
+                for name, value in metrics.items():
+                    self.history.setdefault(name, []).append(value)
+                if self.checkpoint_path:
+                    save_checkpoint(self.checkpoint_path, self.engine.params, self.engine.optimizer, self.history)
+                self.metrics.put(dict(metrics, epoch=epoch))
+        finally:
+            self.metrics.put(None)
@@ -0,0 +1,203 @@
+# quests/simulations.py
+
+from math import atan, degrees, sqrt
+
+import numpy as np
+
+TARGET_POSITION = 10.0  # Target position where the Quest5 mass should stop
+GRAVITY = 9.8           # Quest3 gravity in m/s^2
+
+
+def hypotenuse_correct(a, b, c, tolerance=0.01):
+    """
+    Quest1 answer check: c is the hypotenuse of the right triangle with legs a and b.
+    """
+    return abs(c - sqrt(a ** 2 + b ** 2)) < tolerance
+
+
+def triangle_angles_correct(a, b, alpha, beta, tolerance=0.5):
+    """
+    Quest2 answer check: alpha and beta are the angles (degrees) opposite legs a and b.
+    """
+    return abs(alpha - degrees(atan(a / b))) < tolerance and abs(beta - degrees(atan(b / a))) < tolerance
+
+
+def projectile_range(speed, angle_deg, g=GRAVITY):
+    """
+    Distance travelled on flat ground by a projectile launched at speed (m/s) and angle_deg.
+    """
+    angle_rad = np.radians(angle_deg)
+    t_flight = (2 * speed * np.sin(angle_rad)) / g
+    return speed * np.cos(angle_rad) * t_flight
+
+
+def projectile_hits(speed, angle_deg, target_distance, tolerance=5.0, g=GRAVITY):
+    """
+    Quest3 check: the projectile lands within tolerance metres of the target.
+    """
+    return bool(abs(projectile_range(speed, angle_deg, g) - target_distance) < tolerance)
+
+def simulate_tank_level(kp, ki, kd, desired_level=0.5, dt=0.1, max_time=50):
+    """
+    Simulates the PID-controlled tank for fixed gains and returns every series shown by the plots.
+    """
+    A = 1.0  # Cross-sectional area of the tank
+    Kv_max = 0.5  # Maximum control signal
+    Q_in = 0.1  # Constant inflow
+    Kv_ff = Q_in / np.sqrt(desired_level)  # Feedforward term
+
+    h1 = 0.0
+    time_elapsed = 0.0
+    previous_error = 0.0
+    integral_error = 0.0
+    times = [0.0]
+    levels = [0.0]
+    kv_values = [0.0]
+    error_values = [0.0]
+    integral_error_values = [0.0]
+    derivative_error_values = [0.0]
+
+    while True:
+        error = desired_level - h1
+        derivative_error = (error - previous_error) / dt
+        previous_error = error
+
+        # Update integral error with anti-windup
+        if not (h1 >= 1.0 and error > 0):  # Assuming tank height is 1.0 m
+            integral_error += error * dt
+        integral_error = max(-10, min(integral_error, 10))  # Clamp integral error
+
+        Kv = Kv_ff + kp * error + ki * integral_error - kd * derivative_error
+        Kv = max(0.0, min(Kv, Kv_max))
+
+        Q_out = Kv * np.sqrt(max(h1, 0.0))  # Ensure h1 >= 0.0
+        h1 = min(max(h1 + (Q_in - Q_out) / A * dt, 0.0), 1.0)
+
+        time_elapsed += dt
+        times.append(time_elapsed)
+        levels.append(h1)
+        kv_values.append(Kv)
+        error_values.append(error)
+        integral_error_values.append(integral_error)
+        derivative_error_values.append(derivative_error)
+
+        if time_elapsed >= max_time:
+            break
+
+    return {
+        "times": np.array(times),
+        "h1": np.array(levels),
+        "kv_values": np.array(kv_values),
+        "error_values": np.array(error_values),
+        "integral_error_values": np.array(integral_error_values),
+        "derivative_error_values": np.array(derivative_error_values),
+    }
+
+
+def tank_level_success(data, desired_level=0.5):
+    """
+    The level counts as stable when the last 50 readings stay within 5 cm of the desired level.
+    """
+    levels = np.asarray(data["h1"][-50:])
+    return bool(np.all(np.abs(levels - desired_level) < 0.05))
+
+
+def simulate_mass_spring_damper(mass, spring_const, damping_coeff, initial_displacement, dt=0.01, max_time=10.0):
+    """
+    Simulates the mass-spring-damper for fixed parameters and returns time, position and velocity series.
+    """
+    # Target position relative to initial position; the spring's equilibrium sits there
+    x_target = TARGET_POSITION - initial_displacement
+
+    t = 0.0
+    x = initial_displacement
+    v = 0.0
+    times = [t]
+    positions = [x]
+    velocities = [v]
+
+    while True:
+        a = (-damping_coeff * v - spring_const * (x - x_target)) / mass
+
+        # Update velocity and position using Euler's method
+        v = v + a * dt
+        x = x + v * dt
+        t = t + dt
+
+        times.append(t)
+        positions.append(x)
+        velocities.append(v)
+
+        if t >= max_time:
+            break
+
+    return {"times": np.array(times), "positions": np.array(positions), "velocities": np.array(velocities)}
+
+
+def mass_spring_damper_success(data):
+    """
+    The mass counts as stopped at the target when it is slow and close enough at the end of the run.
+    """
+    velocity_threshold = 0.05  # Threshold for considering the mass as stopped
+    position_tolerance = 0.1   # Acceptable distance from target position
+    position_error = abs(data["positions"][-1] - TARGET_POSITION)
+    return bool(abs(data["velocities"][-1]) < velocity_threshold and position_error < position_tolerance)
+
+
+def simulate_inverted_pendulum(kp_theta, ki_theta, kd_theta, m_c=1.0, m_p=0.1, l=0.5, g=9.81, dt=0.02, max_time=10.0):
+    """
+    Simulates the linearized cart-pendulum under PID control with fixed gains.
+    """
+    x = 0.0
+    x_dot = 0.0
+    theta = 0.05  # Small initial angle in radians
+    theta_dot = 0.0
+    integral_error = 0.0
+    previous_error = 0.0
+    time_elapsed = 0.0
+    times = [0.0]
+    xs = [x]
+    thetas = [theta]
+    control_forces = [0.0]
+
+    while True:
+        # Error for controller (theta should be zero)
+        error = 0.0 - theta
+        integral_error += error * dt
+        derivative_error = (error - previous_error) / dt
+        previous_error = error
+
+        # Control force (PID controller), limited
+        u = kp_theta * error + ki_theta * integral_error + kd_theta * derivative_error
+        u = max(-100.0, min(u, 100.0))
+
+        # Equations of motion (linearized)
+        theta_double_dot = (g * theta + u / (m_c + m_p)) / l
+        x_double_dot = u / (m_c + m_p)
+
+        # Update velocities and positions using Euler's method
+        theta_dot = theta_dot + theta_double_dot * dt
+        theta = theta + theta_dot * dt
+        x_dot = x_dot + x_double_dot * dt
+        x = x + x_dot * dt
+
+        time_elapsed += dt
+        times.append(time_elapsed)
+        xs.append(x)
+        thetas.append(theta)
+        control_forces.append(u)
+
+        if time_elapsed >= max_time:
+            break
+
+    return {"times": np.array(times), "x": np.array(xs), "theta": np.array(thetas),
+            "control_forces": np.array(control_forces)}
+
+
+def inverted_pendulum_success(data, upright_tolerance=0.05, duration=2.0):
+    """
+    The pendulum counts as balanced when it stays within the tolerance (radians) for the last duration seconds.
+    """
+    times = np.asarray(data["times"])
+    recent = times >= times[-1] - duration
+    return bool(np.all(np.abs(np.asarray(data["theta"])[recent]) < upright_tolerance))
@@ -0,0 +1,193 @@
+# result_store.py
+
+import argparse
+import io
+import itertools
+import os
+import sqlite3
+import threading
+from functools import partial
+from multiprocessing import Pool
+
+import numpy as np
+
+DEFAULT_STORE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "precomputed_results.sqlite")
+
+
+def make_key(params):
+    """
+    Builds the lookup key for a set of slider values.
+    Values are rounded so float noise from the sliders (0.30000000000000004) still hits.
+    """
+    return ";".join(f"{name}={float(value):.4f}" for name, value in sorted(params.items()))
+
+
+def slider_range(start, stop, step):
+    """
+    Returns every slider position between start and stop (inclusive) for the given step.
+    """
+    count = int(round((stop - start) / step))
+    return [round(start + i * step, 4) for i in range(count + 1)]
+
+
+def as_stored(data):
+    """
+    Converts simulation series to the float32 arrays the store keeps, so a miss returns what a hit would.
+    """
+    return {name: np.asarray(values, dtype=np.float32) for name, values in data.items()}
+
+
+def encode_result(data):
+    """
+    Packs a dictionary of simulation series into a compressed float32 blob.
+    """
+    buffer = io.BytesIO()
+    np.savez_compressed(buffer, **as_stored(data))
+    return buffer.getvalue()
+
+
+def decode_result(blob):
+    """
+    Unpacks a blob written by encode_result back into a dictionary of arrays.
+    """
+    with np.load(io.BytesIO(blob)) as archive:
+        return {name: archive[name] for name in archive.files}
+
+
+def _compute_entry(params, simulate, evaluate):
+    # Runs in a worker process during precompute
+    data = simulate(**params)
+    return make_key(params), bool(evaluate(data)), encode_result(data)
+
+
+class ResultStore:
+    def __init__(self, path=DEFAULT_STORE_PATH):
+        """
+        On-disk store of precomputed simulation results, keyed by quest and slider values.
+        """
+        self.path = path
+        self._local = threading.local()  # sqlite connections cannot be shared between threads
+
+    def _connection(self, create=False):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            if not create and not os.path.exists(self.path):
+                return None
+            conn = sqlite3.connect(self.path)
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                "namespace TEXT NOT NULL, key TEXT NOT NULL, success INTEGER NOT NULL, payload BLOB NOT NULL, "
+                "PRIMARY KEY (namespace, key)) WITHOUT ROWID")
+            self._local.conn = conn
+        return conn
+
+    def get(self, namespace, params):
+        """
+        Returns (data, success) for the given slider values, or None if they were not precomputed.
+        """
+        conn = self._connection()
+        if conn is None:
+            return None
+        row = conn.execute("SELECT success, payload FROM results WHERE namespace = ? AND key = ?",
+                           (namespace, make_key(params))).fetchone()
+        if row is None:
+            return None
+        return decode_result(row[1]), bool(row[0])
+
+    def put_many(self, namespace, entries):
+        """
+        Writes (key, success, payload) entries in one transaction.
+        """
+        conn = self._connection(create=True)
+        with conn:
+            conn.executemany("INSERT OR REPLACE INTO results (namespace, key, success, payload) VALUES (?, ?, ?, ?)",
+                             [(namespace, key, int(success), payload) for key, success, payload in entries])
+
+    def fetch(self, namespace, params, simulate, evaluate):
+        """
+        Answers from the store when possible and falls back to a live simulation on a miss.
+        simulate is called with the params as keyword arguments; evaluate turns its result into a success flag.
+        Either way the series are float32 arrays and success is judged on the full-precision run, as in precompute.
+        """
+        cached = self.get(namespace, params)
+        if cached is not None:
+            return cached
+        data = simulate(**params)
+        return as_stored(data), bool(evaluate(data))
+
+    def precompute(self, namespace, grid, simulate, evaluate, processes=None, batch_size=500):
+        """
+        Fills the store with every combination of the slider positions in grid.
+        Combinations already in the store are skipped, so an interrupted run can be resumed.
+        Returns the number of new entries.
+        """
+        conn = self._connection(create=True)
+        existing = {key for (key,) in conn.execute("SELECT key FROM results WHERE namespace = ?", (namespace,))}
+        names = list(grid)
+        pending = [dict(zip(names, values)) for values in itertools.product(*grid.values())]
+        pending = [params for params in pending if make_key(params) not in existing]
+
+        worker = partial(_compute_entry, simulate=simulate, evaluate=evaluate)
+        written = 0
+        with Pool(processes) as pool:
+            batch = []
+            for entry in pool.imap_unordered(worker, pending, chunksize=64):
+                batch.append(entry)
+                if len(batch) >= batch_size:
+                    self.put_many(namespace, batch)
+                    written += len(batch)
+                    batch = []
+            if batch:
+                self.put_many(namespace, batch)
+                written += len(batch)
+        return written
+
+
+default_store = ResultStore()
+
+
+def precompute_tk_quests(store, quests=None, processes=None):
+    """
+    Precomputes the slider grids of the Tk quests.
+    """
+    from quests import simulations
+
+    # Slider positions of the Tk quests covered by the precompute
+    tank_grid = {
+        "kp": slider_range(0.0, 5.0, 0.1),
+        "ki": slider_range(0.0, 0.2, 0.01),
+        "kd": slider_range(0.0, 0.2, 0.01),
+    }
+    mass_spring_damper_grid = {
+        "mass": slider_range(0.5, 2.0, 0.1),
+        "spring_const": slider_range(0.5, 2.0, 0.1),
+        "damping_coeff": slider_range(0.0, 3.0, 0.1),
+        "initial_displacement": [0.0],
+    }
+    inverted_pendulum_grid = {
+        "kp_theta": slider_range(50.0, 150.0, 1.0),
+        "ki_theta": slider_range(0.0, 1.0, 0.1),
+        "kd_theta": slider_range(10.0, 30.0, 1.0),
+    }
+
+    jobs = {
+        "tk.quest4": (tank_grid, simulations.simulate_tank_level, simulations.tank_level_success),
+        "tk.quest5": (mass_spring_damper_grid, simulations.simulate_mass_spring_damper,
+                      simulations.mass_spring_damper_success),
+        "tk.quest6": (inverted_pendulum_grid, simulations.simulate_inverted_pendulum,
+                      simulations.inverted_pendulum_success),
+    }
+    for namespace, (grid, simulate, evaluate) in jobs.items():
+        if quests and namespace not in quests:
+            continue
+        written = store.precompute(namespace, grid, simulate, evaluate, processes=processes)
+        print(f"{namespace}: {written} new results")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Precompute Tk quest simulations into the result store.")
+    parser.add_argument("--store", default=DEFAULT_STORE_PATH, help="Path of the SQLite store")
+    parser.add_argument("--quest", action="append", help="Namespace to fill (e.g. tk.quest5); default is all")
+    parser.add_argument("--processes", type=int, default=None, help="Worker processes (default: CPU count)")
+    args = parser.parse_args()
+    precompute_tk_quests(ResultStore(args.store), quests=args.quest, processes=args.processes)
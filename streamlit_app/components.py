@@ -0,0 +1,98 @@
+# ./streamlit_app/components.py
+
+import numpy as np
+import plotly.graph_objects as go
+
+# Animations are resampled to this many frames, whatever the simulation time step
+DEFAULT_FRAME_COUNT = 120
+DEFAULT_FRAME_RATE = 24  # Frames per second during playback
+
+
+class FrameFigure(go.Figure):
+    """
+    Figure whose animation frames are plain dictionaries instead of validated go.Frame objects.
+    Both serialization entry points, to_dict() and to_plotly_json(), add the frames, so st.plotly_chart,
+    to_json(), write_html() and show() all keep the animation.
+    """
+
+    def __init__(self, data=None, layout=None, frames=None):
+        super().__init__(data=data, layout=layout)
+        self._raw_frames = frames if frames is not None else []
+
+    def to_dict(self):
+        figure = super().to_dict()
+        figure["frames"] = self._raw_frames
+        return figure
+
+    def to_plotly_json(self):
+        return self.to_dict()
+
+
+def build_frames(xs, ys):
+    """
+    Build animation frame dictionaries for all steps at once.
+    The number of frames is set beforehand with resample_trajectory.
+
+    Parameters:
+        xs (list): One array per trace of shape (n_steps, n_points) with the trace's x data at every step.
+        ys (list): Matching y data for each trace.
+
+    Returns:
+        list: Frame dictionaries named by their step index. They only carry x/y,
+        the remaining trace properties come from the figure's initial traces.
+    """
+    # One tolist() per trace instead of converting every frame separately
+    trace_xs = [np.asarray(x).tolist() for x in xs]
+    trace_ys = [np.asarray(y).tolist() for y in ys]
+
+    return [
+        {
+            "name": str(step),
+            "data": [{"x": trace_x[step], "y": trace_y[step]} for trace_x, trace_y in zip(trace_xs, trace_ys)],
+        }
+        for step in range(len(trace_xs[0]))
+    ]
+
+
+def resample_trajectory(times, series, frame_count=DEFAULT_FRAME_COUNT):
+    """
+    Resample simulation series onto frame_count evenly spaced times.
+
+    Parameters:
+        times (array): Simulation time of every step.
+        series (list): Arrays sampled at those times.
+        frame_count (int): Number of animation frames wanted.
+
+    Returns:
+        tuple: (frame_times, resampled_series). Trajectories that already fit in the budget are returned as they are.
+    """
+    times = np.asarray(times, dtype=float)
+    if len(times) <= frame_count:
+        return times, [np.asarray(values, dtype=float) for values in series]
+    frame_times = np.linspace(times[0], times[-1], frame_count)
+    return frame_times, [np.interp(frame_times, times, values) for values in series]
+
+
+def play_pause_menu(frame_rate=DEFAULT_FRAME_RATE):
+    """
+    Play/Pause buttons for an animation played back at frame_rate frames per second.
+    """
+    return dict(
+        type="buttons",
+        buttons=[
+            dict(label="Play",
+                 method="animate",
+                 args=[None, {"frame": {"duration": 1000 / frame_rate, "redraw": True},
+                              "fromcurrent": True, "transition": {"duration": 0}}]),
+            dict(label="Pause",
+                 method="animate",
+                 args=[[None], {"frame": {"duration": 0, "redraw": False},
+                                "mode": "immediate",
+                                "transition": {"duration": 0}}])
+        ],
+        showactive=False,
+        x=0.1,
+        y=0,
+        xanchor="right",
+        yanchor="top"
+    )
@@ -0,0 +1,136 @@
+# ./streamlit_app/load_test.py
+
+import argparse
+import multiprocessing
+import os
+import random
+import resource
+import sys
+import time
+
+import numpy as np
+
+MAIN_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "main.py")
+
+# Buttons that start work on a page; pressed after the sliders have been moved
+ACTION_BUTTONS = ("Start Simulation", "Fire Projectile", "Check Answer")
+
+
+def timed_run(element, latencies, errors, label):
+    """
+    Reruns the app through the given AppTest element and records how long the rerun took.
+    Exceptions raised by the app are recorded rather than aborting the session.
+    """
+    start = time.perf_counter()
+    app = element.run()
+    latencies.append((label, time.perf_counter() - start))
+    if app.exception:
+        errors.append(f"{label}: {app.exception[0].message}")
+    return app
+
+
+def move_slider(slider, rng):
+    """
+    Sets a slider to a random position on its step grid.
+    """
+    steps = int(round((slider.max - slider.min) / slider.step))
+    value = slider.min + slider.step * rng.randint(0, steps)
+    return slider.set_value(type(slider.value)(round(value, 4)))
+
+
+def run_session(session_id, iterations, seed, timeout):
+    """
+    Simulates one student: visits every page, moves each slider and presses the page's action buttons.
+    Runs in its own process so peak RSS and CPU time belong to this session alone.
+    """
+    from streamlit.testing.v1 import AppTest
+
+    rng = random.Random(seed + session_id)
+    latencies = []
+    errors = []
+    cpu_start = time.process_time()
+
+    app = AppTest.from_file(MAIN_SCRIPT, default_timeout=timeout)
+    app = timed_run(app, latencies, errors, "initial load")
+    pages = list(app.sidebar.radio[0].options)
+
+    for _ in range(iterations):
+        for page in pages:
+            app = timed_run(app.sidebar.radio[0].set_value(page), latencies, errors, f"open {page}")
+            for index in range(len(app.slider)):
+                app = timed_run(move_slider(app.slider[index], rng), latencies, errors, f"{page} slider")
+            for button in list(app.button):
+                if button.label in ACTION_BUTTONS:
+                    app = timed_run(button.click(), latencies, errors, f"{page} {button.label}")
+
+    return {
+        "session": session_id,
+        "latencies": latencies,
+        "errors": errors,
+        "cpu_seconds": time.process_time() - cpu_start,
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,  # ru_maxrss is in KiB on Linux
+    }
+
+
+def _run_session_args(args):
+    return run_session(*args)
+
+
+def report(results, wall_seconds):
+    """
+    Prints rerun latency percentiles and per-session resource usage.
+    Returns the 95th percentile latency in milliseconds.
+    """
+    latencies_ms = np.array([seconds for result in results for _, seconds in result["latencies"]]) * 1000
+    p50, p90, p95, p99 = np.percentile(latencies_ms, [50, 90, 95, 99])
+    print(f"Sessions: {len(results)}   reruns: {latencies_ms.size}   wall time: {wall_seconds:.1f} s")
+    print(f"Rerun latency (ms): p50 {p50:.0f}   p90 {p90:.0f}   p95 {p95:.0f}   p99 {p99:.0f}   max {latencies_ms.max():.0f}")
+
+    # Slowest kind of rerun, to point at the page that regressed
+    by_label = {}
+    for result in results:
+        for label, seconds in result["latencies"]:
+            by_label.setdefault(label, []).append(seconds * 1000)
+    print("Slowest reruns (median ms):")
+    for label, values in sorted(by_label.items(), key=lambda item: -np.median(item[1]))[:5]:
+        print(f"  {label:<40} {np.median(values):8.0f}")
+
+    rss = np.array([result["peak_rss_mb"] for result in results])
+    cpu = np.array([result["cpu_seconds"] for result in results])
+    print(f"Peak RSS per session (MB): mean {rss.mean():.0f}   max {rss.max():.0f}")
+    print(f"CPU per session (s):       mean {cpu.mean():.1f}   max {cpu.max():.1f}")
+
+    errors = sorted({error for result in results for error in result["errors"]})
+    if errors:
+        print(f"App exceptions ({sum(len(result['errors']) for result in results)} reruns):")
+        for error in errors:
+            print(f"  {error}")
+    return p95
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulate concurrent student sessions against the Streamlit app.")
+    parser.add_argument("--sessions", type=int, default=4, help="Number of concurrent sessions")
+    parser.add_argument("--iterations", type=int, default=1, help="Passes through all pages per session")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the slider positions")
+    parser.add_argument("--timeout", type=float, default=60.0, help="Seconds a single rerun may take")
+    parser.add_argument("--max-p95", type=float, default=None, help="Exit with status 1 if p95 latency (ms) exceeds this")
+    args = parser.parse_args()
+
+    jobs = [(session_id, args.iterations, args.seed, args.timeout) for session_id in range(args.sessions)]
+    start = time.perf_counter()
+    # spawn instead of fork so each session starts from a clean interpreter and its RSS is its own;
+    # maxtasksperchild=1 and chunksize=1 keep a worker from picking up a second session
+    with multiprocessing.get_context("spawn").Pool(args.sessions, maxtasksperchild=1) as pool:
+        results = pool.map(_run_session_args, jobs, chunksize=1)
+    p95 = report(results, time.perf_counter() - start)
+
+    if any(result["errors"] for result in results):
+        sys.exit(1)
+    if args.max_p95 is not None and p95 > args.max_p95:
+        print(f"p95 latency {p95:.0f} ms exceeds the {args.max_p95:.0f} ms budget")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,13 @@
 # ./streamlit_app/main.py
 
+import os
+import sys
+
 import streamlit as st
+
+# Shared top-level modules (e.g. result_store) live one directory up
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
 from quests import quest1, quest3, quest4, quest5, quest6
 
 # Sidebar navigation
@@ -0,0 +1,36 @@
+# ./streamlit_app/precompute.py
+
+import argparse
+import os
+import sys
+
+# Shared top-level modules (e.g. result_store) live one directory up
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from result_store import DEFAULT_STORE_PATH, ResultStore
+from quests import quest4, quest5, quest6
+
+
+def precompute_streamlit_quests(store, quests=None, processes=None):
+    """
+    Precomputes the slider grids of the Streamlit quests.
+    """
+    jobs = {
+        "streamlit.quest4": (quest4.PRECOMPUTE_GRID, quest4.simulate_pid, quest4.check_success),
+        "streamlit.quest5": (quest5.PRECOMPUTE_GRID, quest5.simulate_to_dict, quest5.check_success),
+        "streamlit.quest6": (quest6.PRECOMPUTE_GRID, quest6.simulate_inverted_pendulum, quest6.check_success),
+    }
+    for namespace, (grid, simulate, evaluate) in jobs.items():
+        if quests and namespace not in quests:
+            continue
+        written = store.precompute(namespace, grid, simulate, evaluate, processes=processes)
+        print(f"{namespace}: {written} new results")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Precompute Streamlit quest simulations into the result store.")
+    parser.add_argument("--store", default=DEFAULT_STORE_PATH, help="Path of the SQLite store")
+    parser.add_argument("--quest", action="append", help="Namespace to fill (e.g. streamlit.quest5); default is all")
+    parser.add_argument("--processes", type=int, default=None, help="Worker processes (default: CPU count)")
+    args = parser.parse_args()
+    precompute_streamlit_quests(ResultStore(args.store), quests=args.quest, processes=args.processes)
@@ -3,11 +3,19 @@
 import streamlit as st
 import plotly.graph_objects as go
 import numpy as np
+from result_store import default_store, slider_range
 
 # Constants
 HIT_TOLERANCE = 0.05  # Tolerance for stabilizing water level
 GRAVITY = 9.81         # Acceleration due to gravity (m/s^2)
 
+# Slider positions covered by the offline precompute (python streamlit_app/precompute.py)
+PRECOMPUTE_GRID = {
+    "Kp": slider_range(0.0, 5.0, 0.1),
+    "Ki": slider_range(0.0, 0.2, 0.01),
+    "Kd": slider_range(0.0, 0.2, 0.01),
+}
+
 def reset_simulation():
     """Reset all simulation parameters and session state."""
     st.session_state.water_level = 0.0
@@ -21,6 +29,7 @@ def reset_simulation():
     st.session_state.integral_error_values = [0.0]
     st.session_state.derivative_error_values = [0.0]
     st.session_state.simulation_complete = False
+    st.session_state.success = False
     st.session_state.message = ""
 
 def initialize_session_state():
@@ -47,6 +56,8 @@ def initialize_session_state():
         st.session_state.derivative_error_values = [0.0]
     if "simulation_complete" not in st.session_state:
         st.session_state.simulation_complete = False
+    if "success" not in st.session_state:
+        st.session_state.success = False
     if "message" not in st.session_state:
         st.session_state.message = ""
 
@@ -114,6 +125,10 @@ def simulate_pid(Kp, Ki, Kd, desired_level=0.5, simulation_time=50, dt=0.1):
     
     return simulation_data
 
+def check_success(simulation_data, desired_level=0.5):
+    """Check whether the final water level settled within tolerance of the desired level."""
+    return abs(desired_level - simulation_data["water_levels"][-1]) < HIT_TOLERANCE
+
 def run():
     """Run the Quest 4 simulation."""
     initialize_session_state()
@@ -157,8 +172,9 @@ def run():
     controller_plot_placeholder = st.empty()
 
     if start_button and not st.session_state.simulation_complete:
-        # Simulate PID controller
-        simulation_data = simulate_pid(Kp, Ki, Kd, desired_level=desired_level)
+        # Simulate PID controller (or read the precomputed result)
+        simulation_data, success = default_store.fetch(
+            "streamlit.quest4", {"Kp": Kp, "Ki": Ki, "Kd": Kd}, simulate_pid, check_success)
         
         # Store simulation data in session_state for potential further use
         st.session_state.times = simulation_data["times"]
@@ -167,6 +183,8 @@ def run():
         st.session_state.error_values = simulation_data["error_values"]
         st.session_state.integral_error_values = simulation_data["integral_error_values"]
         st.session_state.derivative_error_values = simulation_data["derivative_error_values"]
+        st.session_state.water_level = simulation_data["water_levels"][-1]
+        st.session_state.success = success
         st.session_state.simulation_complete = True  # Mark simulation as complete
 
     if st.session_state.simulation_complete:
@@ -329,8 +347,7 @@ def run():
         controller_plot_placeholder.plotly_chart(fig_controller, use_container_width=True, key='controller_variables_plot')
 
         # Check Success Criteria
-        final_error = abs(desired_level - st.session_state.water_level)
-        if final_error < HIT_TOLERANCE:
+        if st.session_state.success:
             st.success("Success! The water level is stable around the desired level.")
         else:
             st.error("Failure! The water level did not stabilize as desired. Try adjusting the PID gains.")
@@ -3,21 +3,26 @@
 import streamlit as st
 import numpy as np
 import plotly.graph_objects as go
+from result_store import default_store, slider_range
+from components import (DEFAULT_FRAME_COUNT, DEFAULT_FRAME_RATE, FrameFigure, build_frames, play_pause_menu,
+                        resample_trajectory)
 
 # Constants
 TARGET_POSITION = 10.0  # Target position where the mass should stop
 VELOCITY_THRESHOLD = 0.05  # Threshold for considering the mass as stopped
 POSITION_TOLERANCE = 0.1   # Acceptable distance from target position
 
+# Slider positions covered by the offline precompute (python streamlit_app/precompute.py)
+PRECOMPUTE_GRID = {
+    "m": slider_range(0.5, 2.0, 0.1),
+    "K_s": slider_range(0.5, 2.0, 0.1),
+    "K_d": slider_range(0.0, 3.0, 0.1),
+    "x0": [0.0],
+}
+
 def reset_simulation():
-    """Reset all simulation parameters and session state."""
-    st.session_state.time_elapsed = 0.0
-    st.session_state.times = [0.0]
-    st.session_state.positions = [st.session_state.initial_displacement]
-    st.session_state.velocities = [0.0]
-    st.session_state.simulation_complete = False
-    st.session_state.success = False
-    st.session_state.message = ""
+    """Discard the current simulation result."""
+    st.session_state.spring_result = None
 
 def initialize_session_state():
     """Initialize the session state variables if they do not exist."""
@@ -29,20 +34,8 @@ def initialize_session_state():
         st.session_state.damping_coeff = 0.1
     if 'initial_displacement' not in st.session_state:
         st.session_state.initial_displacement = 0.0
-    if 'time_elapsed' not in st.session_state:
-        st.session_state.time_elapsed = 0.0
-    if 'times' not in st.session_state:
-        st.session_state.times = [0.0]
-    if 'positions' not in st.session_state:
-        st.session_state.positions = [st.session_state.initial_displacement]
-    if 'velocities' not in st.session_state:
-        st.session_state.velocities = [0.0]
-    if 'simulation_complete' not in st.session_state:
-        st.session_state.simulation_complete = False
-    if 'success' not in st.session_state:
-        st.session_state.success = False
-    if 'message' not in st.session_state:
-        st.session_state.message = ""
+    if 'spring_result' not in st.session_state:
+        st.session_state.spring_result = None  # Series, success flag and message of the last run
 
 def simulate_mass_spring_damper(m, K_s, K_d, x0, simulation_time=10.0, dt=0.01):
     """
@@ -87,66 +80,43 @@ def simulate_mass_spring_damper(m, K_s, K_d, x0, simulation_time=10.0, dt=0.01):
 
     return times, positions, velocities
 
-def create_animation(times, positions):
+def simulate_to_dict(m, K_s, K_d, x0):
+    """Run the simulation and return its series by name, as stored in the result store."""
+    times, positions, velocities = simulate_mass_spring_damper(m, K_s, K_d, x0)
+    return {'times': times, 'positions': positions, 'velocities': velocities}
+
+def check_success(simulation_data):
+    """Check whether the mass ended up stopped at the target position."""
+    final_velocity = simulation_data['velocities'][-1]
+    position_error = abs(simulation_data['positions'][-1] - TARGET_POSITION)
+    return abs(final_velocity) < VELOCITY_THRESHOLD and position_error < POSITION_TOLERANCE
+
+def create_animation(times, positions, frame_count=DEFAULT_FRAME_COUNT, frame_rate=DEFAULT_FRAME_RATE):
     """
     Create an animation of the mass-spring-damper system.
+    The trajectory is resampled to frame_count frames played at frame_rate frames per second.
     """
-    frames = []
-    for i in range(len(times)):
-        x = positions[i]
-        # Spring representation
-        spring_x = np.linspace(-10, x, 500)
-        spring_y = 0.1 * np.sin(2 * np.pi * 20 * (spring_x - (-10)) / (x - (-10) + 0.1))
-        # Mass representation
-        mass_x = [x]
-        mass_y = [0]
-
-        frame = go.Frame(
-            data=[
-                go.Scatter(x=spring_x, y=spring_y, mode='lines', line=dict(color='black'), name='Spring'),
-                go.Scatter(x=mass_x, y=mass_y, mode='markers', marker=dict(size=20, color='blue'), name='Mass'),
-            ],
-            name=str(i)
-        )
-        frames.append(frame)
-
-    # Initial data
-    x_init = positions[0]
-    spring_x_init = np.linspace(-10, x_init, 500)
-    spring_y_init = 0.1 * np.sin(2 * np.pi * 20 * (spring_x_init - (-10)) / (x_init - (-10) + 0.1))
-    mass_x_init = [x_init]
-    mass_y_init = [0]
-
-    fig = go.Figure(
+    _, (positions,) = resample_trajectory(times, [positions], frame_count)
+
+    # Spring coordinates for every step at once, shape (n_steps, 500)
+    spring_xs = -10 + (positions[:, None] + 10) * np.linspace(0.0, 1.0, 500)
+    spring_ys = 0.1 * np.sin(2 * np.pi * 20 * (spring_xs - (-10)) / (positions[:, None] - (-10) + 0.1))
+    # Mass representation, shape (n_steps, 1)
+    mass_xs = positions[:, None]
+    mass_ys = np.zeros_like(mass_xs)
+
+    frames = build_frames([spring_xs, mass_xs], [spring_ys, mass_ys])
+
+    fig = FrameFigure(
         data=[
-            go.Scatter(x=spring_x_init, y=spring_y_init, mode='lines', line=dict(color='black'), name='Spring'),
-            go.Scatter(x=mass_x_init, y=mass_y_init, mode='markers', marker=dict(size=20, color='blue'), name='Mass'),
+            go.Scatter(x=spring_xs[0], y=spring_ys[0], mode='lines', line=dict(color='black'), name='Spring'),
+            go.Scatter(x=mass_xs[0], y=mass_ys[0], mode='markers', marker=dict(size=20, color='blue'), name='Mass'),
         ],
         layout=go.Layout(
             xaxis=dict(range=[-15, 15], autorange=False),
             yaxis=dict(range=[-1, 1], autorange=False),
             title="Mass-Spring-Damper System Animation",
-            updatemenus=[
-                dict(
-                    type="buttons",
-                    buttons=[
-                        dict(label="Play",
-                             method="animate",
-                             args=[None, {"frame": {"duration": 50, "redraw": True},
-                                          "fromcurrent": True, "transition": {"duration": 0}}]),
-                        dict(label="Pause",
-                             method="animate",
-                             args=[[None], {"frame": {"duration": 0, "redraw": False},
-                                            "mode": "immediate",
-                                            "transition": {"duration": 0}}])
-                    ],
-                    showactive=False,
-                    x=0.1,
-                    y=0,
-                    xanchor="right",
-                    yanchor="top"
-                )
-            ]
+            updatemenus=[play_pause_menu(frame_rate)]
         ),
         frames=frames
     )
@@ -167,19 +137,17 @@ def create_phase_plot(positions, velocities):
     fig.update_layout(title="Phase Plot (Position vs. Velocity)", xaxis_title="Position", yaxis_title="Velocity")
     return fig
 
-def run():
-    """Run the Quest 5 simulation."""
-    initialize_session_state()
-
-    st.title("Quest 5: Adjust Parameters to Stop the Mass at the Target Position")
-    st.subheader("Adjust the mass-spring-damper parameters to make the mass stop at the target position.")
-
-    # Sidebar for parameter adjustments
-    st.sidebar.header("Simulation Parameters")
-    st.session_state.mass = st.sidebar.slider("Mass (m):", 0.1, 10.0, st.session_state.mass, step=0.1)
-    st.session_state.spring_const = st.sidebar.slider("Spring Constant (K_s):", 0.1, 10.0, st.session_state.spring_const, step=0.1)
-    st.session_state.damping_coeff = st.sidebar.slider("Damping Coefficient (K_d):", 0.0, 5.0, st.session_state.damping_coeff, step=0.1)
-    st.session_state.initial_displacement = st.sidebar.slider("Initial Displacement (x0):", -5.0, 15.0, st.session_state.initial_displacement, step=0.1)
+@st.fragment
+def controls_panel():
+    """
+    Parameter sliders and buttons.
+    Moving a slider reruns only this fragment, so the result and chart panels are not rebuilt.
+    """
+    st.header("Simulation Parameters")
+    st.session_state.mass = st.slider("Mass (m):", 0.1, 10.0, st.session_state.mass, step=0.1)
+    st.session_state.spring_const = st.slider("Spring Constant (K_s):", 0.1, 10.0, st.session_state.spring_const, step=0.1)
+    st.session_state.damping_coeff = st.slider("Damping Coefficient (K_d):", 0.0, 5.0, st.session_state.damping_coeff, step=0.1)
+    st.session_state.initial_displacement = st.slider("Initial Displacement (x0):", -5.0, 15.0, st.session_state.initial_displacement, step=0.1)
 
     # Buttons
     col1, col2, col3 = st.columns(3)
@@ -201,48 +169,61 @@ def run():
         st.stop()
 
     # Start Simulation
-    if start_button and not st.session_state.simulation_complete:
-        times, positions, velocities = simulate_mass_spring_damper(
-            st.session_state.mass,
-            st.session_state.spring_const,
-            st.session_state.damping_coeff,
-            st.session_state.initial_displacement
-        )
-
-        # Update session state with simulation data
-        st.session_state.times = times
-        st.session_state.positions = positions
-        st.session_state.velocities = velocities
-        st.session_state.simulation_complete = True
-
-        # Check for success
-        final_velocity = velocities[-1]
-        final_position = positions[-1]
-        position_error = abs(final_position - TARGET_POSITION)
-
-        if abs(final_velocity) < VELOCITY_THRESHOLD and position_error < POSITION_TOLERANCE:
-            st.session_state.success = True
-            st.session_state.message = "Success! The mass has stopped at the target position."
-        else:
-            st.session_state.success = False
-            st.session_state.message = "Adjust parameters to stop the mass at the target position."
-
-    # Display Simulation Results
-    if st.session_state.simulation_complete:
-        # Animation
-        animation_fig = create_animation(st.session_state.times, st.session_state.positions)
-        st.plotly_chart(animation_fig, use_container_width=True)
-
-        # Displacement over time
-        displacement_fig = create_displacement_plot(st.session_state.times, st.session_state.positions)
-        st.plotly_chart(displacement_fig, use_container_width=True)
-
-        # Phase plot
-        phase_fig = create_phase_plot(st.session_state.positions, st.session_state.velocities)
-        st.plotly_chart(phase_fig, use_container_width=True)
-
-        # Display message
-        if st.session_state.success:
-            st.success(st.session_state.message)
+    if start_button and st.session_state.spring_result is None:
+        params = {
+            'm': st.session_state.mass,
+            'K_s': st.session_state.spring_const,
+            'K_d': st.session_state.damping_coeff,
+            'x0': st.session_state.initial_displacement,
+        }
+        simulation_data, success = default_store.fetch("streamlit.quest5", params, simulate_to_dict, check_success)
+
+        if success:
+            message = "Success! The mass has stopped at the target position."
         else:
-            st.error(st.session_state.message)
+            message = "Adjust parameters to stop the mass at the target position."
+        st.session_state.spring_result = dict(simulation_data, success=success, message=message)
+
+        # A new run changes every panel, so rerun the whole page
+        st.rerun()
+
+@st.fragment
+def result_panel():
+    """Animation of the last run and its outcome."""
+    result = st.session_state.spring_result
+    if result is None:
+        return
+
+    animation_fig = create_animation(result['times'], result['positions'])
+    st.plotly_chart(animation_fig, use_container_width=True)
+
+    if result['success']:
+        st.success(result['message'])
+    else:
+        st.error(result['message'])
+
+@st.fragment
+def charts_panel():
+    """Displacement and phase plots of the last run."""
+    result = st.session_state.spring_result
+    if result is None:
+        return
+
+    # Displacement over time
+    displacement_fig = create_displacement_plot(result['times'], result['positions'])
+    st.plotly_chart(displacement_fig, use_container_width=True)
+
+    # Phase plot
+    phase_fig = create_phase_plot(result['positions'], result['velocities'])
+    st.plotly_chart(phase_fig, use_container_width=True)
+
+def run():
+    """Run the Quest 5 simulation."""
+    initialize_session_state()
+
+    st.title("Quest 5: Adjust Parameters to Stop the Mass at the Target Position")
+    st.subheader("Adjust the mass-spring-damper parameters to make the mass stop at the target position.")
+
+    controls_panel()
+    result_panel()
+    charts_panel()
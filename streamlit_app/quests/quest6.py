@@ -3,6 +3,9 @@
 import streamlit as st
 import numpy as np
 import plotly.graph_objects as go
+from result_store import default_store, slider_range
+from components import (DEFAULT_FRAME_COUNT, DEFAULT_FRAME_RATE, FrameFigure, build_frames, play_pause_menu,
+                        resample_trajectory)
 
 # Physical parameters
 M_C = 1.0   # Mass of the cart (kg)
@@ -16,20 +19,16 @@ UPRIGHT_DURATION = 2.0    # Seconds the pendulum must remain upright
 MAX_SIMULATION_TIME = 10.0  # Maximum simulation time (s)
 DT = 0.02  # Time step (s)
 
+# Slider positions covered by the offline precompute (python streamlit_app/precompute.py)
+PRECOMPUTE_GRID = {
+    "kp": slider_range(50.0, 150.0, 1.0),
+    "ki": slider_range(0.0, 1.0, 0.1),
+    "kd": slider_range(10.0, 30.0, 1.0),
+}
+
 def reset_simulation():
-    """Reset all simulation parameters and session state."""
-    st.session_state.time_elapsed = 0.0
-    st.session_state.times = [0.0]
-    st.session_state.x = [0.0]
-    st.session_state.x_dot = [0.0]
-    st.session_state.theta = [0.05]  # Small initial angle in radians
-    st.session_state.theta_dot = [0.0]
-    st.session_state.control_forces = [0.0]
-    st.session_state.integral_error = 0.0
-    st.session_state.previous_error = 0.0
-    st.session_state.simulation_complete = False
-    st.session_state.success = False
-    st.session_state.message = ""
+    """Discard the current simulation result."""
+    st.session_state.pendulum_result = None
 
 def initialize_session_state():
     """Initialize the session state variables if they do not exist."""
@@ -39,30 +38,8 @@ def initialize_session_state():
         st.session_state.ki_theta = 0.0
     if 'kd_theta' not in st.session_state:
         st.session_state.kd_theta = 20.0
-    if 'time_elapsed' not in st.session_state:
-        st.session_state.time_elapsed = 0.0
-    if 'times' not in st.session_state:
-        st.session_state.times = [0.0]
-    if 'x' not in st.session_state:
-        st.session_state.x = [0.0]
-    if 'x_dot' not in st.session_state:
-        st.session_state.x_dot = [0.0]
-    if 'theta' not in st.session_state:
-        st.session_state.theta = [0.05]
-    if 'theta_dot' not in st.session_state:
-        st.session_state.theta_dot = [0.0]
-    if 'control_forces' not in st.session_state:
-        st.session_state.control_forces = [0.0]
-    if 'integral_error' not in st.session_state:
-        st.session_state.integral_error = 0.0
-    if 'previous_error' not in st.session_state:
-        st.session_state.previous_error = 0.0
-    if 'simulation_complete' not in st.session_state:
-        st.session_state.simulation_complete = False
-    if 'success' not in st.session_state:
-        st.session_state.success = False
-    if 'message' not in st.session_state:
-        st.session_state.message = ""
+    if 'pendulum_result' not in st.session_state:
+        st.session_state.pendulum_result = None  # Series, success flag and message of the last run
 
 def simulate_inverted_pendulum(kp, ki, kd):
     """
@@ -145,63 +122,43 @@ def simulate_inverted_pendulum(kp, ki, kd):
 
     return simulation_data
 
-def create_animation(simulation_data):
+def check_success(simulation_data):
+    """Check whether the pendulum stayed upright for the last UPRIGHT_DURATION seconds."""
+    times = simulation_data['times']
+    theta = simulation_data['theta']
+    indices = [i for i, t in enumerate(times) if t >= times[-1] - UPRIGHT_DURATION]
+    return all(abs(theta[i]) < UPRIGHT_TOLERANCE for i in indices)
+
+def create_animation(simulation_data, frame_count=DEFAULT_FRAME_COUNT, frame_rate=DEFAULT_FRAME_RATE):
     """
     Create an animation of the inverted pendulum system.
+    The trajectory is resampled to frame_count frames played at frame_rate frames per second.
     """
-    times = simulation_data['times']
-    x = simulation_data['x']
-    theta = simulation_data['theta']
+    _, (x, theta) = resample_trajectory(
+        simulation_data['times'], [simulation_data['x'], simulation_data['theta']], frame_count)
+
+    # Trace coordinates for every step at once, shape (n_steps, n_points)
+    cart_xs = np.column_stack([x - 0.2, x + 0.2])
+    cart_ys = np.zeros_like(cart_xs)
+    pendulum_xs = np.column_stack([x, x + L * np.sin(theta)])
+    pendulum_ys = np.column_stack([np.zeros_like(theta), L * np.cos(theta)])
 
-    frames = []
-    for i in range(len(times)):
-        cart_x = x[i]
-        pendulum_x = [cart_x, cart_x + L * np.sin(theta[i])]
-        pendulum_y = [0.0, L * np.cos(theta[i])]
-
-        frame = go.Frame(
-            data=[
-                # Cart
-                go.Scatter(
-                    x=[cart_x - 0.2, cart_x + 0.2],
-                    y=[0.0, 0.0],
-                    mode='lines',
-                    line=dict(color='blue', width=10),
-                    name='Cart'
-                ),
-                # Pendulum
-                go.Scatter(
-                    x=pendulum_x,
-                    y=pendulum_y,
-                    mode='lines+markers',
-                    line=dict(color='red', width=4),
-                    marker=dict(size=12, color='red'),
-                    name='Pendulum'
-                )
-            ],
-            name=str(i)
-        )
-        frames.append(frame)
-
-    # Initial data
-    cart_x = x[0]
-    pendulum_x = [cart_x, cart_x + L * np.sin(theta[0])]
-    pendulum_y = [0.0, L * np.cos(theta[0])]
-
-    fig = go.Figure(
+    frames = build_frames([cart_xs, pendulum_xs], [cart_ys, pendulum_ys])
+
+    fig = FrameFigure(
         data=[
             # Cart
             go.Scatter(
-                x=[cart_x - 0.2, cart_x + 0.2],
-                y=[0.0, 0.0],
+                x=cart_xs[0],
+                y=cart_ys[0],
                 mode='lines',
                 line=dict(color='blue', width=10),
                 name='Cart'
             ),
             # Pendulum
             go.Scatter(
-                x=pendulum_x,
-                y=pendulum_y,
+                x=pendulum_xs[0],
+                y=pendulum_ys[0],
                 mode='lines+markers',
                 line=dict(color='red', width=4),
                 marker=dict(size=12, color='red'),
@@ -213,27 +170,7 @@ def create_animation(simulation_data):
             yaxis=dict(range=[-L - 0.5, L + 0.5], autorange=False, zeroline=False),
             title="Inverted Pendulum Animation",
             height=400,
-            updatemenus=[
-                dict(
-                    type="buttons",
-                    buttons=[
-                        dict(label="Play",
-                             method="animate",
-                             args=[None, {"frame": {"duration": 50, "redraw": True},
-                                          "fromcurrent": True, "transition": {"duration": 0}}]),
-                        dict(label="Pause",
-                             method="animate",
-                             args=[[None], {"frame": {"duration": 0, "redraw": False},
-                                            "mode": "immediate",
-                                            "transition": {"duration": 0}}])
-                    ],
-                    showactive=False,
-                    x=0.1,
-                    y=0,
-                    xanchor="right",
-                    yanchor="top"
-                )
-            ]
+            updatemenus=[play_pause_menu(frame_rate)]
         ),
         frames=frames
     )
@@ -262,18 +199,16 @@ def create_force_plot(simulation_data):
     fig.update_layout(title="Control Force Over Time", xaxis_title="Time (s)", yaxis_title="Force (N)")
     return fig
 
-def run():
-    """Run the Quest 6 simulation."""
-    initialize_session_state()
-
-    st.title("Quest 6: Balance the Inverted Pendulum by Tuning the Controller")
-    st.subheader("Adjust the PID controller gains to balance the inverted pendulum.")
-
-    # Sidebar for controller gains
-    st.sidebar.header("Controller Gains")
-    st.session_state.kp_theta = st.sidebar.slider("Proportional Gain (Kp) for θ:", 0.0, 200.0, st.session_state.kp_theta, step=1.0)
-    st.session_state.ki_theta = st.sidebar.slider("Integral Gain (Ki) for θ:", 0.0, 10.0, st.session_state.ki_theta, step=0.1)
-    st.session_state.kd_theta = st.sidebar.slider("Derivative Gain (Kd) for θ:", 0.0, 50.0, st.session_state.kd_theta, step=1.0)
+@st.fragment
+def controls_panel():
+    """
+    Controller gain sliders and buttons.
+    Moving a slider reruns only this fragment, so the result and chart panels are not rebuilt.
+    """
+    st.header("Controller Gains")
+    st.session_state.kp_theta = st.slider("Proportional Gain (Kp) for θ:", 0.0, 200.0, st.session_state.kp_theta, step=1.0)
+    st.session_state.ki_theta = st.slider("Integral Gain (Ki) for θ:", 0.0, 10.0, st.session_state.ki_theta, step=0.1)
+    st.session_state.kd_theta = st.slider("Derivative Gain (Kd) for θ:", 0.0, 50.0, st.session_state.kd_theta, step=1.0)
 
     # Buttons
     col1, col2, col3 = st.columns(3)
@@ -295,58 +230,60 @@ def run():
         st.stop()
 
     # Start Simulation
-    if start_button and not st.session_state.simulation_complete:
-        simulation_data = simulate_inverted_pendulum(
-            st.session_state.kp_theta,
-            st.session_state.ki_theta,
-            st.session_state.kd_theta
-        )
-
-        # Update session state with simulation data
-        st.session_state.times = simulation_data['times']
-        st.session_state.x = simulation_data['x']
-        st.session_state.x_dot = simulation_data['x_dot']
-        st.session_state.theta = simulation_data['theta']
-        st.session_state.theta_dot = simulation_data['theta_dot']
-        st.session_state.control_forces = simulation_data['control_forces']
-        st.session_state.time_elapsed = simulation_data['times'][-1]
-        st.session_state.simulation_complete = True
-
-        # Check for success
-        indices = [i for i, t in enumerate(st.session_state.times) if t >= st.session_state.time_elapsed - UPRIGHT_DURATION]
-        if all(abs(st.session_state.theta[i]) < UPRIGHT_TOLERANCE for i in indices):
-            st.session_state.success = True
-            st.session_state.message = "Success! You've balanced the pendulum."
+    if start_button and st.session_state.pendulum_result is None:
+        params = {
+            'kp': st.session_state.kp_theta,
+            'ki': st.session_state.ki_theta,
+            'kd': st.session_state.kd_theta,
+        }
+        simulation_data, success = default_store.fetch("streamlit.quest6", params, simulate_inverted_pendulum, check_success)
+
+        if success:
+            message = "Success! You've balanced the pendulum."
         else:
-            st.session_state.success = False
-            st.session_state.message = "The pendulum fell. Try adjusting the controller gains."
-
-    # Display Simulation Results
-    if st.session_state.simulation_complete:
-        # Animation
-        animation_fig = create_animation({
-            'times': st.session_state.times,
-            'x': st.session_state.x,
-            'theta': st.session_state.theta
-        })
-        st.plotly_chart(animation_fig, use_container_width=True)
-
-        # Angle over time
-        angle_fig = create_angle_plot({
-            'times': st.session_state.times,
-            'theta': st.session_state.theta
-        })
-        st.plotly_chart(angle_fig, use_container_width=True)
-
-        # Control force over time
-        force_fig = create_force_plot({
-            'times': st.session_state.times,
-            'control_forces': st.session_state.control_forces
-        })
-        st.plotly_chart(force_fig, use_container_width=True)
-
-        # Display message
-        if st.session_state.success:
-            st.success(st.session_state.message)
-        else:
-            st.error(st.session_state.message)
+            message = "The pendulum fell. Try adjusting the controller gains."
+        st.session_state.pendulum_result = dict(simulation_data, success=success, message=message)
+
+        # A new run changes every panel, so rerun the whole page
+        st.rerun()
+
+@st.fragment
+def result_panel():
+    """Animation of the last run and its outcome."""
+    result = st.session_state.pendulum_result
+    if result is None:
+        return
+
+    animation_fig = create_animation(result)
+    st.plotly_chart(animation_fig, use_container_width=True)
+
+    if result['success']:
+        st.success(result['message'])
+    else:
+        st.error(result['message'])
+
+@st.fragment
+def charts_panel():
+    """Angle and control force plots of the last run."""
+    result = st.session_state.pendulum_result
+    if result is None:
+        return
+
+    # Angle over time
+    angle_fig = create_angle_plot(result)
+    st.plotly_chart(angle_fig, use_container_width=True)
+
+    # Control force over time
+    force_fig = create_force_plot(result)
+    st.plotly_chart(force_fig, use_container_width=True)
+
+def run():
+    """Run the Quest 6 simulation."""
+    initialize_session_state()
+
+    st.title("Quest 6: Balance the Inverted Pendulum by Tuning the Controller")
+    st.subheader("Adjust the PID controller gains to balance the inverted pendulum.")
+
+    controls_panel()
+    result_panel()
+    charts_panel()
@@ -0,0 +1,105 @@
+# task_scheduler.py
+
+from collections import defaultdict
+
+FRAME_MS = 16  # About one display frame at 60 Hz
+
+
+class TaskScheduler:
+    def __init__(self, root):
+        """
+        Wraps root.after so every scheduled callback belongs to an owner (usually a quest)
+        and all of an owner's pending callbacks can be cancelled at once.
+        """
+        self.root = root
+        self._owners = {}                  # after id -> owner
+        self._jobs = defaultdict(set)      # owner -> after ids
+
+    def after(self, owner, delay_ms, callback, *args):
+        """
+        Schedules callback(*args) after delay_ms milliseconds on behalf of owner. Returns the job id.
+        """
+        job_id = None
+
+        def run():
+            self._forget(job_id)
+            callback(*args)
+
+        job_id = self.root.after(delay_ms, run)
+        self._owners[job_id] = owner
+        self._jobs[owner].add(job_id)
+        return job_id
+
+    def _forget(self, job_id):
+        owner = self._owners.pop(job_id, None)
+        if owner is not None:
+            self._jobs[owner].discard(job_id)
+            if not self._jobs[owner]:
+                del self._jobs[owner]
+
+    def cancel(self, job_id):
+        if job_id in self._owners:
+            self.root.after_cancel(job_id)
+            self._forget(job_id)
+
+    def cancel_owner(self, owner):
+        """
+        Cancels every pending callback of owner. Returns how many were cancelled.
+        """
+        job_ids = list(self._jobs.get(owner, ()))
+        for job_id in job_ids:
+            self.cancel(job_id)
+        return len(job_ids)
+
+    def cancel_all(self):
+        return sum(self.cancel_owner(owner) for owner in list(self._jobs))
+
+    def is_pending(self, job_id):
+        return job_id in self._owners
+
+    def active_count(self, owner=None):
+        """
+        Number of pending callbacks, overall or for one owner; for diagnostics.
+        """
+        if owner is None:
+            return len(self._owners)
+        return len(self._jobs.get(owner, ()))
+
+
+class CoalescedCall:
+    def __init__(self, scheduler, owner, callback, delay_ms=FRAME_MS):
+        """
+        Collapses bursts of calls, e.g. slider or mouse motion events, into at most one callback per delay_ms.
+        Calling the instance only marks the state dirty; callback runs once the delay has passed and should
+        read the latest values itself. Arguments of the calls (such as the value a tk.Scale passes) are ignored.
+        """
+        self.scheduler = scheduler
+        self.owner = owner
+        self.callback = callback
+        self.delay_ms = delay_ms
+        self.job_id = None
+
+    def __call__(self, *args):
+        # The pending job may also have been cancelled with the rest of the owner's jobs
+        if not self.scheduler.is_pending(self.job_id):
+            self.job_id = self.scheduler.after(self.owner, self.delay_ms, self._run)
+
+    def _run(self):
+        self.job_id = None
+        self.callback()
+
+    def cancel(self):
+        """
+        Drops a pending callback, e.g. when the state it would show was reset.
+        """
+        if self.job_id is not None:
+            self.scheduler.cancel(self.job_id)
+            self.job_id = None
+
+    def flush(self):
+        """
+        Runs a pending callback right away.
+        """
+        if self.scheduler.is_pending(self.job_id):
+            self.cancel()
+            self._run()
@@ -0,0 +1,164 @@
+# telemetry.py
+
+import argparse
+import glob
+import os
+import threading
+import time
+import uuid
+from numbers import Number
+
+import numpy as np
+
+from event_bus import AttemptSubmitted, QuestStarted, SimulationFinished
+
+DEFAULT_TELEMETRY_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "save_data", "telemetry")
+BASE_COLUMNS = ("session", "player", "quest_id", "timestamp", "time_to_answer", "success")
+
+
+class TelemetryLog:
+    def __init__(self, directory=DEFAULT_TELEMETRY_DIR, flush_every=256, session=None):
+        """
+        Buffers one row per attempt and writes them in batches as compressed columnar .npz chunks.
+        Attempt parameters become columns named "param.<name>".
+        """
+        self.directory = directory
+        self.flush_every = flush_every
+        self.session = session or uuid.uuid4().hex
+        self._rows = []
+        self._started = {}  # (player, quest_id) -> time the quest was started
+        self._lock = threading.Lock()
+        self._chunk = 0
+
+    def attach(self, events):
+        """
+        Records attempts from an EventBus; the handlers run on the bus thread, off the Tk loop.
+        """
+        events.subscribe(QuestStarted, self.on_quest_started)
+        events.subscribe(AttemptSubmitted, self.on_attempt)
+        events.subscribe(SimulationFinished, self.on_attempt)
+
+    def on_quest_started(self, event):
+        with self._lock:
+            self._started[(event.player, event.quest_id)] = event.timestamp
+
+    def on_attempt(self, event):
+        # Simulations are reported after their replay; the attempt itself was made when the run was started
+        submitted_at = getattr(event, "submitted_at", None) or event.timestamp
+        with self._lock:
+            # Time since the quest was started, or since the previous attempt at it
+            key = (event.player, event.quest_id)
+            started = self._started.get(key)
+            self._started[key] = submitted_at
+            row = {
+                "session": self.session,
+                "player": event.player,
+                "quest_id": event.quest_id,
+                "timestamp": submitted_at,
+                "time_to_answer": submitted_at - started if started is not None else np.nan,
+                "success": event.success,
+            }
+            row.update({f"param.{name}": value for name, value in event.parameters.items()})
+            self._rows.append(row)
+            full = len(self._rows) >= self.flush_every
+        if full:
+            self.flush()
+
+    def flush(self):
+        """
+        Writes the buffered rows as one chunk. Returns the chunk path, or None if there was nothing to write.
+        """
+        with self._lock:
+            rows, self._rows = self._rows, []
+            self._chunk += 1
+            chunk = self._chunk
+        if not rows:
+            return None
+
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, f"attempts-{int(time.time())}-{self.session[:8]}-{chunk:05d}.npz")
+        # Write to a temporary file first so readers never see a half-written chunk
+        tmp_path = f"{path[:-len('.npz')]}.tmp.npz"
+        np.savez_compressed(tmp_path, **rows_to_columns(rows))
+        os.replace(tmp_path, path)
+        return path
+
+
+def _column(values):
+    # Numeric columns use NaN for missing values, anything else becomes a string column with "" for missing
+    if all(value is None or (isinstance(value, Number) and not isinstance(value, bool)) for value in values):
+        return np.array([np.nan if value is None else value for value in values], dtype=np.float64)
+    return np.array(["" if value is None else str(value) for value in values])
+
+
+def rows_to_columns(rows):
+    names = list(BASE_COLUMNS) + sorted({name for row in rows for name in row} - set(BASE_COLUMNS))
+    columns = {name: _column([row.get(name) for row in rows]) for name in names}
+    columns["quest_id"] = columns["quest_id"].astype(np.int64)
+    columns["success"] = np.array([bool(row["success"]) for row in rows])
+    return columns
+
+
+def load_telemetry(directory=DEFAULT_TELEMETRY_DIR):
+    """
+    Concatenates every chunk into one dictionary of columns.
+    Parameter columns missing from a chunk are filled with NaN (numeric) or "" (text).
+    """
+    chunks = []
+    for path in sorted(glob.glob(os.path.join(directory, "attempts-*.npz"))):
+        if path.endswith(".tmp.npz"):
+            continue
+        with np.load(path) as archive:
+            chunks.append({name: archive[name] for name in archive.files})
+    if not chunks:
+        return {}
+
+    names = list(BASE_COLUMNS) + sorted({name for chunk in chunks for name in chunk} - set(BASE_COLUMNS))
+    columns = {}
+    for name in names:
+        parts = []
+        for chunk in chunks:
+            length = len(chunk["quest_id"])
+            if name in chunk:
+                parts.append(chunk[name])
+            else:
+                text = any(name in other and other[name].dtype.kind == "U" for other in chunks)
+                parts.append(np.full(length, "", dtype="U1") if text else np.full(length, np.nan))
+        columns[name] = np.concatenate(parts)
+    return columns
+
+
+def summarize(columns):
+    """
+    Per-quest attempt count, success rate and median time-to-answer.
+    """
+    quest_ids, index = np.unique(columns["quest_id"], return_inverse=True)
+    attempts = np.bincount(index)
+    successes = np.bincount(index, weights=columns["success"].astype(np.float64))
+    summary = []
+    for k, quest_id in enumerate(quest_ids):
+        times = columns["time_to_answer"][index == k]
+        times = times[~np.isnan(times)]
+        summary.append({
+            "quest_id": int(quest_id),
+            "attempts": int(attempts[k]),
+            "success_rate": float(successes[k] / attempts[k]),
+            "median_time_to_answer": float(np.median(times)) if times.size else float("nan"),
+            "sessions": int(np.unique(columns["session"][index == k]).size),
+        })
+    return summary
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Summarize recorded quest attempts.")
+    parser.add_argument("--dir", default=DEFAULT_TELEMETRY_DIR, help="Telemetry directory")
+    args = parser.parse_args()
+
+    columns = load_telemetry(args.dir)
+    if not columns:
+        print("No telemetry recorded yet.")
+    else:
+        print(f"{len(columns['quest_id'])} attempts from {np.unique(columns['session']).size} sessions")
+        for row in summarize(columns):
+            print(f"Quest {row['quest_id']}: {row['attempts']} attempts, {row['success_rate']:.0%} success, "
+                  f"median {row['median_time_to_answer']:.1f} s to answer, {row['sessions']} sessions")
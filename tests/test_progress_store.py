@@ -0,0 +1,54 @@
+# tests/test_progress_store.py
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from progress_store import ProgressStore
+
+
+def seeded_store(directory, players):
+    store = ProgressStore(directory)
+    store.load()
+    for index in range(players):
+        store.record("player_started", f"player{index}")
+    store.close()
+    store.load()
+    return store
+
+
+def test_record_stays_under_a_millisecond_with_a_large_snapshot(tmp_path):
+    store = seeded_store(str(tmp_path), players=2000)
+    durations = []
+    for index in range(1000):  # Past the old every-200-events compaction boundaries
+        start = time.perf_counter()
+        store.record("quest_completed", f"player{index}", quest_id=1, points=10)
+        durations.append(time.perf_counter() - start)
+    store.close()
+    assert max(durations) < 0.001
+
+
+def test_record_leaves_the_snapshot_alone(tmp_path):
+    store = seeded_store(str(tmp_path), players=10)
+    modified = os.path.getmtime(store.snapshot_path)
+    for index in range(500):
+        store.record("quest_completed", f"player{index % 10}", quest_id=index, points=1)
+    assert os.path.getmtime(store.snapshot_path) == modified
+    store.close()
+
+
+def test_progress_survives_a_crash_and_a_clean_close(tmp_path):
+    store = seeded_store(str(tmp_path), players=10)
+    for index in range(23):
+        store.record("quest_completed", f"player{index % 10}", quest_id=index, points=1)
+    expected = store.state
+    store._journal.close()  # Simulate a crash: no close(), the events are only in the journal
+
+    reloaded = ProgressStore(str(tmp_path))
+    assert reloaded.load() == expected
+    reloaded.record("quest_skipped", "player0")
+    expected = reloaded.state
+    reloaded.close()
+    assert ProgressStore(str(tmp_path)).load() == expected
@@ -3,12 +3,14 @@
 import tkinter as tk
 from tkinter import ttk
 from ui_utils import setup_styles  # Centralized styling utility
+from task_scheduler import TaskScheduler
 
 class UserInterface:
     def __init__(self):
         self.root = tk.Tk()
         self.root.title("Math Quest Game")
         self.root.geometry("800x600")
+        self.root.protocol("WM_DELETE_WINDOW", self.close)
 
         # Initialize variables with self.root as the master
         self.player_name = tk.StringVar(self.root)
@@ -17,6 +19,7 @@ class UserInterface:
         self.game_engine = None  # Will be set by GameEngine
 
         self.error_label = None  # Initialize error_label here
+        self.scheduler = TaskScheduler(self.root)  # Timers of the running quest, cancelled when it ends
 
         setup_styles()  # Apply styles after root is created
 
@@ -24,27 +27,65 @@ class UserInterface:
         self.content_frame = tk.Frame(self.root)
         self.content_frame.pack(fill=tk.BOTH, expand=True)
 
+        # Screens are built once and then only shown or hidden
+        self.screens = {}
+        self.current_screen = None
+        self.quest_frame = None
+        self.journey_button_text = tk.StringVar(self.root)
+        self.status_text = tk.StringVar(self.root)
+        self.leaderboard_rank_text = tk.StringVar(self.root)
+
         self.get_player_name()
 
+    def show_screen(self, name, build):
+        """
+        Shows the named screen, calling build(frame) to create its widgets the first time.
+        """
+        screen = self.screens.get(name)
+        if screen is None:
+            screen = tk.Frame(self.content_frame)
+            build(screen)
+            self.screens[name] = screen
+        self._switch_to(screen)
+        return screen
+
+    def show_quest_frame(self):
+        """
+        Returns an empty frame for a quest. Each quest runs once per journey, so its frame is not cached;
+        the previous quest's frame is destroyed and the menu screens are only hidden.
+        """
+        if self.quest_frame is not None:
+            self.quest_frame.destroy()
+        self.quest_frame = tk.Frame(self.content_frame)
+        self._switch_to(self.quest_frame)
+        return self.quest_frame
+
+    def _switch_to(self, frame):
+        if self.current_screen is not None and self.current_screen is not frame and self.current_screen.winfo_exists():
+            self.current_screen.pack_forget()
+        frame.pack(fill=tk.BOTH, expand=True)
+        self.current_screen = frame
+
     def get_player_name(self):
-        # Destroy any existing widgets in content_frame
-        for widget in self.content_frame.winfo_children():
-            widget.destroy()
-        
-        self.name_frame = tk.Frame(self.content_frame)
-        self.name_frame.pack(fill=tk.BOTH, expand=True)
-
-        ttk.Label(self.name_frame, text="Math Quest Game", style='Title.TLabel').pack(pady=20)
-        ttk.Label(self.name_frame, text="Enter your name:", style='TLabel').pack(pady=10)
-        self.name_entry = ttk.Entry(self.name_frame, textvariable=self.player_name)
+        self.show_screen("name", self.build_name_screen)
+
+    def build_name_screen(self, frame):
+        self.name_frame = frame
+        ttk.Label(frame, text="Math Quest Game", style='Title.TLabel').pack(pady=20)
+        ttk.Label(frame, text="Enter your name:", style='TLabel').pack(pady=10)
+        self.name_entry = ttk.Entry(frame, textvariable=self.player_name)
         self.name_entry.pack(pady=5)
-        ttk.Button(self.name_frame, text="Submit", command=self.submit_name).pack(pady=10)
+        ttk.Button(frame, text="Submit", command=self.submit_name).pack(pady=10)
 
     def submit_name(self):
-        if self.player_name.get().strip():
+        name = self.player_name.get().strip()
+        if name:
             if self.error_label:
                 self.error_label.destroy()  # Remove existing error message
-            self.name_frame.destroy()
+                self.error_label = None
+            # Load this player's saved progress before the menu shows their points and next quest
+            self.player_name.set(name)
+            self.game_engine.select_player(name)
             self.create_main_menu()
         else:
             if not self.error_label:
@@ -55,15 +96,18 @@ class UserInterface:
                 pass
 
     def create_main_menu(self):
-        # Destroy any existing widgets in content_frame
-        for widget in self.content_frame.winfo_children():
-            widget.destroy()
-
-        self.main_menu_frame = tk.Frame(self.content_frame)
-        self.main_menu_frame.pack(fill=tk.BOTH, expand=True)
+        # Only the journey button's text changes between visits
+        total_quests = len(self.game_engine.quests)
+        current_quest = self.game_engine.current_quest_index + 1
+        self.journey_button_text.set(
+            "Start The Quest Journey" if self.game_engine.current_quest_index == 0 else
+            f"Continue to Quest {current_quest}" if current_quest <= total_quests else
+            "All Quests Completed")
+        self.main_menu_frame = self.show_screen("main_menu", self.build_main_menu)
 
+    def build_main_menu(self, frame):
         # Scoreboard
-        scoreboard = tk.Frame(self.main_menu_frame)
+        scoreboard = tk.Frame(frame)
         scoreboard.pack(side=tk.TOP, fill=tk.X, pady=10)
         ttk.Label(scoreboard, text="Player:").pack(side=tk.LEFT, pady=5)
         ttk.Label(scoreboard, textvariable=self.player_name).pack(side=tk.LEFT)
@@ -71,54 +115,78 @@ class UserInterface:
         ttk.Label(scoreboard, textvariable=self.player_points).pack(side=tk.LEFT)
 
         # Main menu buttons
-        menu_frame = tk.Frame(self.main_menu_frame)
+        menu_frame = tk.Frame(frame)
         menu_frame.pack(expand=True)
 
-        total_quests = len(self.game_engine.quests)
-        current_quest = self.game_engine.current_quest_index + 1
-        button_text = (
-            "Start The Quest Journey" if self.game_engine.current_quest_index == 0 else
-            f"Continue to Quest {current_quest}" if current_quest <= total_quests else
-            "All Quests Completed")
-
-        ttk.Button(menu_frame, text=button_text, command=self.start_quest_journey).pack(pady=10)
+        ttk.Button(menu_frame, textvariable=self.journey_button_text, command=self.start_quest_journey).pack(pady=10)
         ttk.Button(menu_frame, text="View Status", command=self.view_status).pack(pady=10)
-        ttk.Button(menu_frame, text="Exit", command=self.root.quit).pack(pady=10)
+        ttk.Button(menu_frame, text="Leaderboard", command=self.view_leaderboard).pack(pady=10)
+        ttk.Button(menu_frame, text="Switch Player", command=self.switch_player).pack(pady=10)
+        ttk.Button(menu_frame, text="Exit", command=self.close).pack(pady=10)
+
+    def switch_player(self):
+        # Back to the name screen; the current name stays filled in until another one is submitted
+        self.get_player_name()
 
     def start_quest_journey(self):
         if self.start_quest_journey_callback:
-            # Hide the main menu frame
-            self.main_menu_frame.pack_forget()
             self.start_quest_journey_callback()
 
     def show_completion_message(self):
-        # Destroy any existing widgets in content_frame
-        for widget in self.content_frame.winfo_children():
-            widget.destroy()
-
-        completion_frame = tk.Frame(self.content_frame)
-        completion_frame.pack(fill=tk.BOTH, expand=True)
+        self.show_screen("completion", self.build_completion_screen)
 
-        ttk.Label(completion_frame, text="Congratulations!", style='Complete.Title.TLabel').pack(pady=20)
-        ttk.Label(completion_frame, text="You have completed all quests.", style='Complete.TLabel').pack(pady=10)
-        ttk.Button(completion_frame, text="View Status", command=self.view_status).pack(pady=10)
-        ttk.Button(completion_frame, text="Exit", command=self.root.quit).pack(pady=10)
+    def build_completion_screen(self, frame):
+        ttk.Label(frame, text="Congratulations!", style='Complete.Title.TLabel').pack(pady=20)
+        ttk.Label(frame, text="You have completed all quests.", style='Complete.TLabel').pack(pady=10)
+        ttk.Button(frame, text="View Status", command=self.view_status).pack(pady=10)
+        ttk.Button(frame, text="Exit", command=self.close).pack(pady=10)
 
     def view_status(self):
-        # Destroy any existing widgets in content_frame
-        for widget in self.content_frame.winfo_children():
-            widget.destroy()
+        self.status_text.set(f"Player: {self.player_name.get()}\nPoints: {self.player_points.get()}")
+        self.status_frame = self.show_screen("status", self.build_status_screen)
 
-        self.status_frame = tk.Frame(self.content_frame)
-        self.status_frame.pack(fill=tk.BOTH, expand=True)
+    def build_status_screen(self, frame):
+        tk.Label(frame, textvariable=self.status_text, font=("Helvetica", 16)).pack(pady=20)
+        ttk.Button(frame, text="Back to Menu", command=self.back_to_menu).pack(pady=10)
 
-        status = f"Player: {self.player_name.get()}\nPoints: {self.player_points.get()}"
-        tk.Label(self.status_frame, text=status, font=("Helvetica", 16)).pack(pady=20)
+    def view_leaderboard(self, top_k=10):
+        self.leaderboard_frame = self.show_screen("leaderboard", lambda frame: self.build_leaderboard_screen(frame, top_k))
 
-        ttk.Button(self.status_frame, text="Back to Menu", command=self.back_to_menu).pack(pady=10)
+        # Refresh the rows; the table itself is reused
+        leaderboard = self.game_engine.leaderboard
+        self.leaderboard_table.delete(*self.leaderboard_table.get_children())
+        for row in leaderboard.top(top_k):
+            self.leaderboard_table.insert("", tk.END, values=row)
+
+        # Rank of the current player, who may be outside the top k
+        rank = leaderboard.rank(self.player_name.get())
+        self.leaderboard_rank_text.set(f"Your rank: {rank} of {len(leaderboard)}" if rank is not None else "")
+
+    def build_leaderboard_screen(self, frame, top_k):
+        ttk.Label(frame, text="Leaderboard", style='Title.TLabel').pack(pady=20)
+
+        columns = ("rank", "player", "points", "quests")
+        self.leaderboard_table = ttk.Treeview(frame, columns=columns, show="headings", height=top_k)
+        for column, heading, width in zip(columns, ("#", "Player", "Points", "Quests"), (50, 200, 80, 80)):
+            self.leaderboard_table.heading(column, text=heading)
+            self.leaderboard_table.column(column, width=width, anchor=tk.CENTER)
+        self.leaderboard_table.pack(pady=10)
+
+        ttk.Label(frame, textvariable=self.leaderboard_rank_text).pack(pady=5)
+        ttk.Button(frame, text="Back to Menu", command=self.back_to_menu).pack(pady=10)
 
     def back_to_menu(self):
         self.create_main_menu()
 
     def run(self):
         self.root.mainloop()
+
+    def close(self):
+        """
+        Stops the running quest and cancels every pending timer while the root still exists,
+        then closes the window and ends the loop.
+        """
+        if self.game_engine is not None:
+            self.game_engine.stop_current_quest()
+        self.scheduler.cancel_all()
+        self.root.destroy()
@@ -321,7 +321,7 @@ class Visualization:
         ax_train_acc = axs[1, 0]
         ax_train_acc.set_title('Training Accuracy')
         ax_train_acc.set_xlabel('Epoch')
-        ax_train_acc.set_ylabel('Accuracy (%)')
+        ax_train_acc.set_ylabel('Accuracy')
         line_train_acc, = ax_train_acc.plot([], [], label='Training Accuracy', color='green')
         ax_train_acc.legend()
 
@@ -329,7 +329,7 @@ class Visualization:
         ax_val_acc = axs[1, 1]
         ax_val_acc.set_title('Validation Accuracy')
         ax_val_acc.set_xlabel('Epoch')
-        ax_val_acc.set_ylabel('Accuracy (%)')
+        ax_val_acc.set_ylabel('Accuracy')
         line_val_acc, = ax_val_acc.plot([], [], label='Validation Accuracy', color='red')
         ax_val_acc.legend()
 
@@ -341,3 +341,33 @@ class Visualization:
                 ax_val_loss, line_val_loss,
                 ax_train_acc, line_train_acc,
                 ax_val_acc, line_val_acc)
+
+    @staticmethod
+    def create_model_comparison_plots(parent, labels):
+        """
+        Validation loss and accuracy curves with one line per model, for comparing hyperparameter settings.
+        """
+        fig, axs = plt.subplots(2, 1, figsize=(8, 8), dpi=100)
+        fig.subplots_adjust(hspace=0.35, right=0.75)
+
+        # Validation Loss per model
+        ax_loss = axs[0]
+        ax_loss.set_title('Validation Loss by Setting')
+        ax_loss.set_xlabel('Epoch')
+        ax_loss.set_ylabel('Loss')
+        loss_lines = [ax_loss.plot([], [], label=label)[0] for label in labels]
+
+        # Validation Accuracy per model, sharing the loss plot's colors
+        ax_acc = axs[1]
+        ax_acc.set_title('Validation Accuracy by Setting')
+        ax_acc.set_xlabel('Epoch')
+        ax_acc.set_ylabel('Accuracy')
+        acc_lines = [ax_acc.plot([], [], label=label, color=line.get_color())[0]
+                     for label, line in zip(labels, loss_lines)]
+        ax_loss.legend(loc='upper left', bbox_to_anchor=(1.02, 1.0), fontsize='small')
+
+        canvas = FigureCanvasTkAgg(fig, master=parent)
+        canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+        canvas.draw()
+
+        return canvas, fig, ax_loss, loss_lines, ax_acc, acc_lines